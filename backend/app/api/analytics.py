@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import case, distinct, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import List, Literal, Optional
+from app.core.database import get_async_db
+from app.api.deps import get_current_user
+from app.api.pagination import keyset_paginate
+from app.models.audit_attribute import AuditAttribute
+from app.models.audit_finding import AuditFinding
+from app.models.user import User
+from app.models.work_paper import WorkPaper
+from app.schemas.analytics import AttributeFailureRate, SubmitterFailureRate
+from app.schemas.work_paper import WorkPaperSummary
+
+router = APIRouter()
+
+
+def _count_status(status: str):
+    return func.sum(case((AuditFinding.status == status, 1), else_=0))
+
+
+_EVALUATED = func.count(AuditFinding.id)
+_FAILURE_RATE = _count_status("fail") * 1.0 / _EVALUATED
+
+
+@router.get("/attributes", response_model=List[AttributeFailureRate])
+async def get_attribute_failure_rates(
+    limit: int = Query(100, ge=1, le=1000),
+    min_evaluated: int = Query(1, ge=1),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Attributes ordered by how often they fail, counted over the latest conclusion of every paper"""
+    stmt = (
+        select(
+            AuditFinding.attribute_id,
+            AuditAttribute.name.label("attribute_name"),
+            _EVALUATED.label("evaluated"),
+            _count_status("pass").label("passed"),
+            _count_status("fail").label("failed"),
+            _count_status("warning").label("warnings"),
+            _FAILURE_RATE.label("failure_rate")
+        )
+        .outerjoin(AuditAttribute, AuditAttribute.id == AuditFinding.attribute_id)
+        .group_by(AuditFinding.attribute_id, AuditAttribute.name)
+        .having(_EVALUATED >= min_evaluated)
+        .order_by(_FAILURE_RATE.desc(), AuditFinding.attribute_id)
+        .limit(limit)
+    )
+    return [row._asdict() for row in await db.execute(stmt)]
+
+
+@router.get("/submitters", response_model=List[SubmitterFailureRate])
+async def get_submitter_failure_rates(
+    limit: int = Query(100, ge=1, le=1000),
+    min_evaluated: int = Query(1, ge=1),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Submitters ordered by the share of failed findings across their work papers"""
+    stmt = (
+        select(
+            WorkPaper.submitted_by,
+            User.email,
+            func.count(distinct(AuditFinding.work_paper_id)).label("work_papers"),
+            _EVALUATED.label("evaluated"),
+            _count_status("fail").label("failed"),
+            _count_status("warning").label("warnings"),
+            _FAILURE_RATE.label("failure_rate")
+        )
+        .select_from(AuditFinding)
+        .join(WorkPaper, WorkPaper.id == AuditFinding.work_paper_id)
+        .outerjoin(User, User.id == WorkPaper.submitted_by)
+        .group_by(WorkPaper.submitted_by, User.email)
+        .having(_EVALUATED >= min_evaluated)
+        .order_by(_FAILURE_RATE.desc(), WorkPaper.submitted_by)
+        .limit(limit)
+    )
+    return [row._asdict() for row in await db.execute(stmt)]
+
+
+@router.get("/attributes/{attribute_id}/work-papers", response_model=List[WorkPaperSummary])
+async def get_work_papers_by_finding(
+    attribute_id: int,
+    response: Response,
+    finding_status: Literal["pass", "fail", "warning"] = Query("fail", alias="status"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Work papers whose latest conclusion has this status for the attribute, by id with X-Next-Cursor paging"""
+    matching = select(AuditFinding.work_paper_id).where(
+        AuditFinding.attribute_id == attribute_id, AuditFinding.status == finding_status
+    )
+    stmt = select(WorkPaper).options(load_only(
+        WorkPaper.id, WorkPaper.title, WorkPaper.description, WorkPaper.submitted_by,
+        WorkPaper.submitted_at, WorkPaper.status
+    )).where(WorkPaper.id.in_(matching))
+    return await keyset_paginate(
+        db, stmt, response, WorkPaper.id, WorkPaper.id,
+        cursor=cursor, limit=limit, include_total=include_total
+    )
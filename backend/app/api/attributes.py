@@ -1,44 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.api.deps import get_current_user, get_current_manager
+from typing import List, Literal, Optional
+from app.core.database import get_async_db, get_db
+from app.api.deps import get_current_user, get_current_manager, get_current_manager_sync
+from app.api.pagination import keyset_paginate
 from app.models.user import User
-from app.models.audit_attribute import AuditAttribute
+from app.models.audit_attribute import AuditAttribute, AttributeType, RuleType
 from app.schemas.audit_attribute import AuditAttributeCreate, AuditAttributeUpdate, AuditAttributeResponse
+from app.schemas.bulk_import import ImportResult
+from app.services import bulk_import, rule_compiler, rule_set
+from app.services.expressions import ExpressionError
+from app.services.formats import UnsafePatternError
 
 router = APIRouter()
 
 
+def _validate_rule(rule_type: Optional[RuleType], rule_parameters: Optional[dict]) -> None:
+    """Reject rules whose format, pattern or expression the engine could not use"""
+    try:
+        rule_compiler.check_rule(rule_type, rule_parameters)
+    except (UnsafePatternError, ExpressionError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/", response_model=List[AuditAttributeResponse])
-def get_attributes(
+async def get_attributes(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    attribute_type: Optional[AttributeType] = None,
+    rule_type: Optional[RuleType] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    attributes = db.query(AuditAttribute).offset(skip).limit(limit).all()
-    return attributes
+    """List attributes by id; pass the X-Next-Cursor response header back as cursor for the next page"""
+    stmt = select(AuditAttribute)
+    if attribute_type is not None:
+        stmt = stmt.where(AuditAttribute.attribute_type == attribute_type)
+    if rule_type is not None:
+        stmt = stmt.where(AuditAttribute.rule_type == rule_type)
+    return await keyset_paginate(
+        db, stmt, response, AuditAttribute.id, AuditAttribute.id,
+        cursor=cursor, limit=limit, include_total=include_total, skip=skip
+    )
 
 
 @router.get("/{attribute_id}", response_model=AuditAttributeResponse)
-def get_attribute(
+async def get_attribute(
     attribute_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    attribute = db.query(AuditAttribute).filter(AuditAttribute.id == attribute_id).first()
+    attribute = await db.get(AuditAttribute, attribute_id)
     if not attribute:
         raise HTTPException(status_code=404, detail="Attribute not found")
     return attribute
 
 
 @router.post("/", response_model=AuditAttributeResponse, status_code=status.HTTP_201_CREATED)
-def create_attribute(
+async def create_attribute(
     attribute: AuditAttributeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_manager)
 ):
+    _validate_rule(attribute.rule_type, attribute.rule_parameters)
     db_attribute = AuditAttribute(
         name=attribute.name,
         description=attribute.description,
@@ -50,40 +79,64 @@ def create_attribute(
         created_by=current_user.id
     )
     db.add(db_attribute)
-    db.commit()
-    db.refresh(db_attribute)
+    await db.run_sync(rule_set.bump_version)
+    await db.commit()
+    await db.refresh(db_attribute)
     return db_attribute
 
 
+@router.post("/import", response_model=ImportResult)
+def import_attributes(
+    file: UploadFile = File(...),
+    file_format: Optional[Literal["csv", "jsonl"]] = Query(None, alias="format"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_manager_sync)
+):
+    """Create attributes from a CSV or JSON Lines file; rows that fail are reported by line"""
+    try:
+        file_format = bulk_import.detect_format(file.filename, file_format)
+        return bulk_import.import_attributes(db, file.file, file_format, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.put("/{attribute_id}", response_model=AuditAttributeResponse)
-def update_attribute(
+async def update_attribute(
     attribute_id: int,
     attribute: AuditAttributeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_manager)
 ):
-    db_attribute = db.query(AuditAttribute).filter(AuditAttribute.id == attribute_id).first()
+    db_attribute = await db.get(AuditAttribute, attribute_id)
     if not db_attribute:
         raise HTTPException(status_code=404, detail="Attribute not found")
     
     update_data = attribute.model_dump(exclude_unset=True)
+    _validate_rule(
+        update_data.get("rule_type", db_attribute.rule_type),
+        update_data.get("rule_parameters", db_attribute.rule_parameters)
+    )
     for field, value in update_data.items():
         setattr(db_attribute, field, value)
     
-    db.commit()
-    db.refresh(db_attribute)
+    await db.run_sync(rule_set.bump_version)
+    await db.commit()
+    await db.refresh(db_attribute)
+    rule_compiler.invalidate(attribute_id)
     return db_attribute
 
 
 @router.delete("/{attribute_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_attribute(
+async def delete_attribute(
     attribute_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_manager)
 ):
-    db_attribute = db.query(AuditAttribute).filter(AuditAttribute.id == attribute_id).first()
+    db_attribute = await db.get(AuditAttribute, attribute_id)
     if not db_attribute:
         raise HTTPException(status_code=404, detail="Attribute not found")
-    db.delete(db_attribute)
-    db.commit()
+    await db.delete(db_attribute)
+    await db.run_sync(rule_set.bump_version)
+    await db.commit()
+    rule_compiler.invalidate(attribute_id)
     return None
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.models.audit_job import AuditJob
+from app.schemas.audit_job import AuditJobResponse
+from app.schemas.work_paper import AuditBatchRequest
+from app.services.audit_jobs import enqueue_audit_job
+
+router = APIRouter()
+
+
+@router.post("/", response_model=AuditJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_audit_job(
+    request: AuditBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue an audit to be run by the background workers"""
+    if request.work_paper_ids is None and request.status is None:
+        raise HTTPException(status_code=400, detail="Provide work_paper_ids or status")
+    
+    return await db.run_sync(
+        lambda session: enqueue_audit_job(
+            session, current_user.id, work_paper_ids=request.work_paper_ids, status=request.status,
+            incremental=request.incremental
+        )
+    )
+
+
+@router.get("/{job_id}", response_model=AuditJobResponse)
+async def get_audit_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    job = await db.get(AuditJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Audit job not found")
+    return job
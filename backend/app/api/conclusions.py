@@ -1,33 +1,192 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.api.deps import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import List, Optional, Literal
+from datetime import datetime
+from app.core import http_cache
+from app.core.database import get_async_db
+from app.api.deps import get_current_user, get_current_user_sync
+from app.api.pagination import keyset_paginate
 from app.models.user import User
 from app.models.conclusion import Conclusion
-from app.schemas.conclusion import ConclusionResponse
+from app.schemas.conclusion import ConclusionResponse, ConclusionSummary
+from app.services import exports
+from app.services.narrative import buffered, iter_conclusion_narrative
 
 router = APIRouter()
 
 
+class ConclusionListParams:
+    """Query parameters shared by the conclusion listings"""
+
+    def __init__(
+        self,
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        order_by: Literal["id", "overall_score"] = "id",
+        descending: bool = False,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        generated_from: Optional[datetime] = None,
+        generated_to: Optional[datetime] = None,
+        include_total: bool = False
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.order_by = order_by
+        self.descending = descending
+        self.min_score = min_score
+        self.max_score = max_score
+        self.generated_from = generated_from
+        self.generated_to = generated_to
+        self.include_total = include_total
+
+    async def paginate(self, db: AsyncSession, stmt, response: Response) -> list:
+        if self.min_score is not None:
+            stmt = stmt.where(Conclusion.overall_score >= self.min_score)
+        if self.max_score is not None:
+            stmt = stmt.where(Conclusion.overall_score <= self.max_score)
+        if self.generated_from is not None:
+            stmt = stmt.where(Conclusion.generated_at >= self.generated_from)
+        if self.generated_to is not None:
+            stmt = stmt.where(Conclusion.generated_at <= self.generated_to)
+        sort_column = Conclusion.overall_score if self.order_by == "overall_score" else Conclusion.id
+        return await keyset_paginate(
+            db, stmt, response, sort_column, Conclusion.id,
+            cursor=self.cursor, limit=self.limit, descending=self.descending,
+            include_total=self.include_total
+        )
+
+
+def _to_response(conclusion: Conclusion) -> ConclusionResponse:
+    """Response for a saved conclusion, rendering its narrative if it was saved without one"""
+    response = ConclusionResponse.model_validate(conclusion)
+    if not response.cpa_conclusion_text:
+        response.cpa_conclusion_text = "".join(
+            iter_conclusion_narrative(response.compliance_summary, response.findings)
+        )
+    return response
+
+
+async def _conclusion_response(
+    request: Request, db: AsyncSession, conclusion_id: int, generated_at: Optional[datetime]
+) -> Response:
+    async def render():
+        conclusion = await db.get(Conclusion, conclusion_id)
+        if not conclusion:
+            raise HTTPException(status_code=404, detail="Conclusion not found")
+        body = _to_response(conclusion).model_dump_json().encode("utf-8")
+        return http_cache.make_etag(http_cache.CONCLUSION, conclusion.id, conclusion.generated_at), body
+
+    etag = http_cache.make_etag(http_cache.CONCLUSION, conclusion_id, generated_at)
+    return await http_cache.conditional_response(request, (http_cache.CONCLUSION, conclusion_id), etag, render)
+
+
+@router.get("/", response_model=List[ConclusionResponse])
+async def get_conclusions(
+    response: Response,
+    params: ConclusionListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List conclusions; pass the X-Next-Cursor response header back as cursor for the next page"""
+    return [_to_response(conclusion) for conclusion in await params.paginate(db, select(Conclusion), response)]
+
+
+@router.get("/summaries", response_model=List[ConclusionSummary])
+async def get_conclusion_summaries(
+    response: Response,
+    params: ConclusionListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List conclusions without loading findings or narrative text"""
+    stmt = select(Conclusion).options(load_only(
+        Conclusion.id, Conclusion.work_paper_id, Conclusion.overall_score,
+        Conclusion.compliance_summary, Conclusion.generated_at
+    ))
+    return await params.paginate(db, stmt, response)
+
+
+def _export_response(columns, rows, file_format: str, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        exports.export(columns, rows, file_format),
+        media_type=exports.MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{file_format}"'}
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_conclusions(
+    file_format: exports.ExportFormat = Query("csv", alias="format"),
+    generated_from: Optional[datetime] = None,
+    generated_to: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user_sync)
+):
+    """Stream every conclusion's score and counts, ordered by id"""
+    rows = exports.conclusion_rows(generated_from, generated_to)
+    return _export_response(exports.CONCLUSION_COLUMNS, rows, file_format, "conclusions")
+
+
+@router.get("/findings/export", response_class=StreamingResponse)
+def export_findings(
+    file_format: exports.ExportFormat = Query("csv", alias="format"),
+    generated_from: Optional[datetime] = None,
+    generated_to: Optional[datetime] = None,
+    finding_status: Optional[Literal["pass", "fail", "warning"]] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_user_sync)
+):
+    """Stream the findings of every conclusion, one row per finding"""
+    rows = exports.finding_rows(generated_from, generated_to, finding_status)
+    return _export_response(exports.FINDING_COLUMNS, rows, file_format, "findings")
+
+
 @router.get("/{conclusion_id}", response_model=ConclusionResponse)
-def get_conclusion(
+async def get_conclusion(
+    conclusion_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a conclusion; send If-None-Match with its ETag to get a 304 while it is unchanged"""
+    row = (await db.execute(
+        select(Conclusion.id, Conclusion.generated_at).where(Conclusion.id == conclusion_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Conclusion not found")
+    return await _conclusion_response(request, db, *row)
+
+
+@router.get("/{conclusion_id}/narrative", response_class=StreamingResponse)
+async def stream_conclusion_narrative(
     conclusion_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    conclusion = db.query(Conclusion).filter(Conclusion.id == conclusion_id).first()
+    """Stream the CPA narrative as markdown, rendering it from the findings if it was not stored"""
+    conclusion = await db.scalar(select(Conclusion).options(load_only(
+        Conclusion.compliance_summary, Conclusion.findings, Conclusion.cpa_conclusion_text
+    )).where(Conclusion.id == conclusion_id))
     if not conclusion:
         raise HTTPException(status_code=404, detail="Conclusion not found")
-    return conclusion
+    chunks = iter_conclusion_narrative(
+        conclusion.compliance_summary, conclusion.findings, conclusion.cpa_conclusion_text
+    )
+    return StreamingResponse(buffered(chunks), media_type="text/markdown")
 
 
 @router.get("/work-papers/{work_paper_id}/conclusion", response_model=ConclusionResponse)
-def get_conclusion_by_work_paper(
+async def get_conclusion_by_work_paper(
     work_paper_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    conclusion = db.query(Conclusion).filter(Conclusion.work_paper_id == work_paper_id).first()
-    if not conclusion:
+    row = (await db.execute(
+        select(Conclusion.id, Conclusion.generated_at).where(Conclusion.work_paper_id == work_paper_id)
+    )).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Conclusion not found for this work paper")
-    return conclusion
+    return await _conclusion_response(request, db, *row)
@@ -1,77 +1,114 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.session import make_transient_to_detached
 from typing import Optional
-from app.core.database import get_db
+import time
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
 from app.core.security import decode_access_token, get_password_hash
 from app.models.user import User, UserRole
 from app.schemas.user import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
+# token -> email (None for invalid tokens), and email -> detached User snapshot
+_token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+_user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+_DEFAULT_USER_KEY = ("default",)
+_MISSING = object()
+
+
+def invalidate_user_cache(email: Optional[str] = None) -> None:
+    """Forget cached users after they change; also resets the cached default user"""
+    if email is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(email)
+    _user_cache.pop(_DEFAULT_USER_KEY)
+
+
+def _snapshot(user: User) -> User:
+    """Detached copy of a user that can be merged into any session without a query"""
+    copy = User(
+        id=user.id,
+        email=user.email,
+        password_hash=user.password_hash,
+        role=user.role,
+        created_at=user.created_at
+    )
+    make_transient_to_detached(copy)
+    return copy
+
+
+async def _from_cache(db: AsyncSession, key) -> Optional[User]:
+    cached = _user_cache.get(key)
+    if cached is None:
+        return None
+    return await db.merge(cached, load=False)
+
+
+async def _get_default_user(db: AsyncSession) -> User:
+    """Return first user from database, or create a default one"""
+    user = await _from_cache(db, _DEFAULT_USER_KEY)
+    if user is not None:
+        return user
+
+    default_user = await db.scalar(select(User).limit(1))
+    if default_user is None:
+        # Create a default manager user if none exists
+        default_user = User(
+            email="default@example.com",
+            password_hash=await run_in_threadpool(get_password_hash, "default"),
+            role=UserRole.MANAGER
+        )
+        db.add(default_user)
+        await db.commit()
+        await db.refresh(default_user)
+    _user_cache.set(_DEFAULT_USER_KEY, _snapshot(default_user))
+    return default_user
+
+
+def _resolve_email(token: str) -> Optional[str]:
+    """Decode a token to its subject, caching the result until the token expires"""
+    email = _token_cache.get(token, _MISSING)
+    if email is not _MISSING:
+        return email
+
+    payload = decode_access_token(token)
+    email = payload.get("sub") if payload is not None else None
+    ttl = None
+    if payload is not None and payload.get("exp") is not None:
+        ttl = min(settings.AUTH_CACHE_TTL_SECONDS, payload["exp"] - time.time())
+    _token_cache.set(token, email, ttl)
+    return email
+
 
 async def get_current_user_optional(
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current user or return a default user if no token provided"""
     if token is None:
-        # Return first user from database, or create a default one
-        default_user = db.query(User).first()
-        if default_user is None:
-            # Create a default manager user if none exists
-            default_user = User(
-                email="default@example.com",
-                password_hash=get_password_hash("default"),
-                role=UserRole.MANAGER
-            )
-            db.add(default_user)
-            db.commit()
-            db.refresh(default_user)
-        return default_user
-    
-    payload = decode_access_token(token)
-    if payload is None:
-        # Return default user if token is invalid
-        default_user = db.query(User).first()
-        if default_user is None:
-            default_user = User(
-                email="default@example.com",
-                password_hash=get_password_hash("default"),
-                role=UserRole.MANAGER
-            )
-            db.add(default_user)
-            db.commit()
-            db.refresh(default_user)
-        return default_user
-    
-    email: str = payload.get("sub")
+        return await _get_default_user(db)
+
+    # Return default user if token is invalid or has no subject
+    email = _resolve_email(token)
     if email is None:
-        default_user = db.query(User).first()
-        if default_user is None:
-            default_user = User(
-                email="default@example.com",
-                password_hash=get_password_hash("default"),
-                role=UserRole.MANAGER
-            )
-            db.add(default_user)
-            db.commit()
-            db.refresh(default_user)
-        return default_user
-    
-    user = db.query(User).filter(User.email == email).first()
+        return await _get_default_user(db)
+
+    user = await _from_cache(db, email)
+    if user is not None:
+        return user
+
+    user = await db.scalar(select(User).where(User.email == email))
     if user is None:
-        default_user = db.query(User).first()
-        if default_user is None:
-            default_user = User(
-                email="default@example.com",
-                password_hash=get_password_hash("default"),
-                role=UserRole.MANAGER
-            )
-            db.add(default_user)
-            db.commit()
-            db.refresh(default_user)
-        return default_user
+        return await _get_default_user(db)
+    _user_cache.set(email, _snapshot(user))
     return user
 
 
@@ -84,3 +121,52 @@ async def get_current_manager(
 ) -> User:
     # Allow access for all users when auth is disabled
     return current_user
+
+
+# Sync counterparts for sync routes, so the user is loaded on the route's own session
+# rather than opening an async one alongside it
+
+def _get_default_user_sync(db: Session) -> User:
+    cached = _user_cache.get(_DEFAULT_USER_KEY)
+    if cached is not None:
+        return db.merge(cached, load=False)
+
+    default_user = db.scalar(select(User).limit(1))
+    if default_user is None:
+        default_user = User(
+            email="default@example.com",
+            password_hash=get_password_hash("default"),
+            role=UserRole.MANAGER
+        )
+        db.add(default_user)
+        db.commit()
+        db.refresh(default_user)
+    _user_cache.set(_DEFAULT_USER_KEY, _snapshot(default_user))
+    return default_user
+
+
+def get_current_user_sync(
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """get_current_user for routes that use the sync session"""
+    email = _resolve_email(token) if token is not None else None
+    if email is None:
+        return _get_default_user_sync(db)
+
+    cached = _user_cache.get(email)
+    if cached is not None:
+        return db.merge(cached, load=False)
+
+    user = db.scalar(select(User).where(User.email == email))
+    if user is None:
+        return _get_default_user_sync(db)
+    _user_cache.set(email, _snapshot(user))
+    return user
+
+
+def get_current_manager_sync(
+    current_user: User = Depends(get_current_user_sync)
+) -> User:
+    # Allow access for all users when auth is disabled
+    return current_user
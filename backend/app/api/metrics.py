@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+from app.core import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus scrape endpoint; only mounted when METRICS_ENABLED is set"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
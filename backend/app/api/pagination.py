@@ -0,0 +1,88 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, columns: List[Any]) -> List[Any]:
+    """Decode an opaque cursor back into typed values for the given sort columns"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort order")
+        return [_coerce(value, column) for value, column in zip(values, columns)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _coerce(value: Any, column) -> Any:
+    if value is None and column.nullable:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+async def keyset_paginate(
+    db: AsyncSession,
+    stmt: Select,
+    response: Response,
+    sort_column,
+    id_column,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False,
+    include_total: bool = False,
+    skip: int = 0
+) -> list:
+    """Return one page ordered by (sort_column, id_column), setting the next-page cursor header
+
+    The id column breaks ties so pages are stable; skip is only honoured without a cursor.
+    Rows whose sort value is NULL come last in either direction, ordered by id.
+    """
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+
+    columns = [id_column] if sort_column is id_column else [sort_column, id_column]
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        if len(columns) == 1:
+            stmt = stmt.where(id_column < values[0] if descending else id_column > values[0])
+        else:
+            sort_value, last_id = values
+            after_id = id_column < last_id if descending else id_column > last_id
+            if sort_value is None:
+                stmt = stmt.where(sort_column.is_(None), after_id)
+            else:
+                after_sort = sort_column < sort_value if descending else sort_column > sort_value
+                conditions = [after_sort, and_(sort_column == sort_value, after_id)]
+                if sort_column.nullable:
+                    conditions.append(sort_column.is_(None))
+                stmt = stmt.where(or_(*conditions))
+
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    if len(columns) > 1 and sort_column.nullable:
+        # Portable NULLS LAST: false sorts before true
+        order_by.insert(0, sort_column.is_(None))
+    stmt = stmt.order_by(*order_by)
+    if skip and not cursor:
+        stmt = stmt.offset(skip)
+    rows = (await db.scalars(stmt.limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, column.key) for column in columns])
+    return rows
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.api.deps import get_current_manager_sync
+from app.models.user import User
+from app.schemas.upload import BlobGarbageCollectionResponse
+from app.services.file_storage import collect_garbage
+
+router = APIRouter()
+
+
+@router.post("/gc", response_model=BlobGarbageCollectionResponse)
+def collect_upload_garbage(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_manager_sync)
+):
+    """Recount blob references and delete uploads no work paper points to"""
+    return collect_garbage(db)
@@ -1,42 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional, Literal
+import asyncio
 import json
 import os
-import uuid
 from datetime import datetime
-from app.core.database import get_db
+from app.core import http_cache, metrics
+from app.core.database import get_async_db, get_db
 from app.core.config import settings
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_user_sync
+from app.api.pagination import keyset_paginate
 from app.models.user import User
 from app.models.work_paper import WorkPaper, WorkPaperStatus
-from app.schemas.work_paper import WorkPaperCreate, WorkPaperResponse
+from app.schemas.bulk_import import ImportResult
+from app.schemas.work_paper import WorkPaperCreate, WorkPaperUpdate, WorkPaperResponse, WorkPaperSummary, AuditBatchRequest, AuditBatchResponse
+from app.services import bulk_import
+from app.services.audit_runner import AuditRunner
+from app.services.file_storage import StoredFile, FileTooLargeError, store_blob, add_blob_references
 
 router = APIRouter()
 
 
-def save_uploaded_file(file: UploadFile, work_paper_id: int) -> str:
-    """Save uploaded file and return relative path"""
-    file_ext = os.path.splitext(file.filename)[1]
+def check_file_extension(filename: str) -> str:
+    file_ext = os.path.splitext(filename)[1]
     if file_ext not in settings.ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail=f"File type {file_ext} not allowed")
+    return file_ext
+
+
+def save_uploaded_file(file: UploadFile) -> StoredFile:
+    """Stream uploaded file into the content-addressed store and return its blob"""
+    file_ext = check_file_extension(file.filename)
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail="File too large")
     
-    # Create directory for work paper
-    work_paper_dir = os.path.join(settings.UPLOAD_DIR, str(work_paper_id))
-    os.makedirs(work_paper_dir, exist_ok=True)
-    
-    # Generate unique filename
-    filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(work_paper_dir, filename)
-    
-    # Save file
-    with open(file_path, "wb") as f:
-        content = file.file.read()
-        if len(content) > settings.MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="File too large")
-        f.write(content)
-    
-    return os.path.join(str(work_paper_id), filename).replace("\\", "/")
+    try:
+        return store_blob(file.file, file_ext, settings.MAX_FILE_SIZE)
+    except FileTooLargeError:
+        raise HTTPException(status_code=400, detail="File too large")
+
+
+async def save_uploaded_files(files: List[UploadFile]) -> List[StoredFile]:
+    """Write all files of one submission concurrently in the threadpool
+
+    Blobs written before a failure stay unreferenced and are removed by garbage collection.
+    """
+    results = await asyncio.gather(
+        *(run_in_threadpool(save_uploaded_file, file) for file in files),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
 
 
 @router.post("/", response_model=WorkPaperResponse, status_code=status.HTTP_201_CREATED)
@@ -45,7 +64,7 @@ async def create_work_paper(
     description: Optional[str] = Form(None),
     form_data: Optional[str] = Form(None),  # JSON string
     files: List[UploadFile] = File(default=[]),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Parse form_data if provided
@@ -56,101 +75,206 @@ async def create_work_paper(
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid form_data JSON")
     
-    # Create work paper first to get ID
+    # Reject disallowed file types before anything is written
+    uploads = [file for file in files if file.filename]
+    for file in uploads:
+        check_file_extension(file.filename)
+    
+    # Store files first so a rejected upload leaves no work paper behind
+    stored_files = await save_uploaded_files(uploads)
+    
     db_work_paper = WorkPaper(
         title=title,
         description=description,
         form_data=parsed_form_data,
+        file_paths=[stored_file.blob_id for stored_file in stored_files] or None,
         submitted_by=current_user.id,
         status=WorkPaperStatus.PENDING
     )
     db.add(db_work_paper)
-    db.commit()
-    db.refresh(db_work_paper)
-    
-    # Save uploaded files
-    file_paths = []
-    for file in files:
-        if file.filename:
-            file_path = save_uploaded_file(file, db_work_paper.id)
-            file_paths.append(file_path)
-    
-    # Update work paper with file paths
-    if file_paths:
-        db_work_paper.file_paths = file_paths
-        db.commit()
-        db.refresh(db_work_paper)
+    await db.run_sync(lambda session: add_blob_references(session, stored_files))
+    await db.commit()
+    await db.refresh(db_work_paper)
     
     return db_work_paper
 
 
-@router.get("/", response_model=List[WorkPaperResponse])
-def get_work_papers(
-    skip: int = 0,
-    limit: int = 100,
+@router.post("/import", response_model=ImportResult)
+def import_work_papers(
+    file: UploadFile = File(...),
+    file_format: Optional[Literal["csv", "jsonl"]] = Query(None, alias="format"),
     db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_sync)
+):
+    """Create work papers from a CSV or JSON Lines file; rows that fail are reported by line"""
+    try:
+        file_format = bulk_import.detect_format(file.filename, file_format)
+        return bulk_import.import_work_papers(db, file.file, file_format, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class WorkPaperListParams:
+    """Query parameters shared by the work paper listings"""
+
+    def __init__(
+        self,
+        skip: int = 0,
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        order_by: Literal["id", "submitted_at"] = "id",
+        descending: bool = False,
+        status_filter: Optional[WorkPaperStatus] = Query(None, alias="status"),
+        submitted_by: Optional[int] = None,
+        submitted_from: Optional[datetime] = None,
+        submitted_to: Optional[datetime] = None,
+        include_total: bool = False
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.order_by = order_by
+        self.descending = descending
+        self.status_filter = status_filter
+        self.submitted_by = submitted_by
+        self.submitted_from = submitted_from
+        self.submitted_to = submitted_to
+        self.include_total = include_total
+
+    async def paginate(self, db: AsyncSession, stmt, response: Response) -> list:
+        if self.status_filter is not None:
+            stmt = stmt.where(WorkPaper.status == self.status_filter)
+        if self.submitted_by is not None:
+            stmt = stmt.where(WorkPaper.submitted_by == self.submitted_by)
+        if self.submitted_from is not None:
+            stmt = stmt.where(WorkPaper.submitted_at >= self.submitted_from)
+        if self.submitted_to is not None:
+            stmt = stmt.where(WorkPaper.submitted_at <= self.submitted_to)
+        sort_column = WorkPaper.submitted_at if self.order_by == "submitted_at" else WorkPaper.id
+        return await keyset_paginate(
+            db, stmt, response, sort_column, WorkPaper.id,
+            cursor=self.cursor, limit=self.limit, descending=self.descending,
+            include_total=self.include_total, skip=self.skip
+        )
+
+
+@router.get("/", response_model=List[WorkPaperResponse])
+async def get_work_papers(
+    response: Response,
+    params: WorkPaperListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    work_papers = db.query(WorkPaper).offset(skip).limit(limit).all()
-    return work_papers
+    """List work papers; pass the X-Next-Cursor response header back as cursor for the next page"""
+    return await params.paginate(db, select(WorkPaper), response)
+
+
+@router.get("/summaries", response_model=List[WorkPaperSummary])
+async def get_work_paper_summaries(
+    response: Response,
+    params: WorkPaperListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List work papers without loading the form_data and file_paths columns"""
+    stmt = select(WorkPaper).options(load_only(
+        WorkPaper.id, WorkPaper.title, WorkPaper.description, WorkPaper.submitted_by,
+        WorkPaper.submitted_at, WorkPaper.status
+    ))
+    return await params.paginate(db, stmt, response)
 
 
 @router.get("/{work_paper_id}", response_model=WorkPaperResponse)
-def get_work_paper(
+async def get_work_paper(
     work_paper_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
+    """Get a work paper; send If-None-Match with its ETag to get a 304 while it is unchanged"""
+    row = (await db.execute(
+        select(WorkPaper.updated_at, WorkPaper.submitted_at).where(WorkPaper.id == work_paper_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Work paper not found")
+
+    async def render():
+        work_paper = await db.get(WorkPaper, work_paper_id)
+        if not work_paper:
+            raise HTTPException(status_code=404, detail="Work paper not found")
+        body = WorkPaperResponse.model_validate(work_paper).model_dump_json().encode("utf-8")
+        version = work_paper.updated_at or work_paper.submitted_at
+        return http_cache.make_etag(http_cache.WORK_PAPER, work_paper_id, version), body
+
+    # Rows written before updated_at existed fall back to their submission time
+    etag = http_cache.make_etag(http_cache.WORK_PAPER, work_paper_id, row.updated_at or row.submitted_at)
+    return await http_cache.conditional_response(request, (http_cache.WORK_PAPER, work_paper_id), etag, render)
+
+
+@router.put("/{work_paper_id}", response_model=WorkPaperResponse)
+def update_work_paper(
+    work_paper_id: int,
+    work_paper_update: WorkPaperUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_sync)
+):
+    """Update a work paper; an audited paper is re-checked against the attributes reading changed fields"""
     work_paper = db.query(WorkPaper).filter(WorkPaper.id == work_paper_id).first()
     if not work_paper:
         raise HTTPException(status_code=404, detail="Work paper not found")
+    
+    update_data = work_paper_update.model_dump(exclude_unset=True)
+    old_form_data = work_paper.form_data or {}
+    for field, value in update_data.items():
+        setattr(work_paper, field, value)
+    
+    if "form_data" in update_data and work_paper.status == WorkPaperStatus.AUDITED:
+        new_form_data = work_paper.form_data or {}
+        changed_fields = {
+            key for key in old_form_data.keys() | new_form_data.keys()
+            if key not in old_form_data or key not in new_form_data or old_form_data[key] != new_form_data[key]
+        }
+        AuditRunner(db).audit_work_papers([work_paper], changed_fields=changed_fields)
+    else:
+        db.commit()
+    http_cache.invalidate(http_cache.WORK_PAPER, [work_paper_id])
+    db.refresh(work_paper)
     return work_paper
 
 
 @router.post("/{work_paper_id}/audit", response_model=WorkPaperResponse)
 def trigger_audit(
     work_paper_id: int,
+    full: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_sync)
 ):
-    """Trigger audit for a work paper - generates conclusion"""
-    from app.models.conclusion import Conclusion
-    from app.services.audit_engine import AuditEngine
-    from app.services.conclusion_generator import ConclusionGenerator
-    
-    # Get work paper
-    work_paper = db.query(WorkPaper).filter(WorkPaper.id == work_paper_id).first()
+    """Trigger audit for a work paper - generates or patches its conclusion
+
+    Only attributes whose definition or referenced inputs changed are re-evaluated
+    unless full is set.
+    """
+    with metrics.phase("load_paper"):
+        work_paper = db.query(WorkPaper).filter(WorkPaper.id == work_paper_id).first()
     if not work_paper:
         raise HTTPException(status_code=404, detail="Work paper not found")
     
-    # Check if conclusion already exists
-    existing_conclusion = db.query(Conclusion).filter(Conclusion.work_paper_id == work_paper_id).first()
-    if existing_conclusion:
-        # Update existing conclusion
-        db.delete(existing_conclusion)
-        db.commit()
-    
-    # Run audit
-    audit_engine = AuditEngine(db)
-    audit_results = audit_engine.audit_work_paper(work_paper_id)
-    
-    # Generate conclusion
-    conclusion_generator = ConclusionGenerator(db)
-    conclusion_data = conclusion_generator.generate_conclusion(work_paper_id, audit_results)
-    
-    # Create conclusion record
-    db_conclusion = Conclusion(
-        work_paper_id=work_paper_id,
-        overall_score=conclusion_data["overall_score"],
-        compliance_summary=conclusion_data["compliance_summary"],
-        findings=conclusion_data["findings"],
-        cpa_conclusion_text=conclusion_data["cpa_conclusion_text"]
-    )
-    db.add(db_conclusion)
-    
-    # Update work paper status
-    work_paper.status = WorkPaperStatus.AUDITED
-    db.commit()
+    AuditRunner(db).audit_work_papers([work_paper], incremental=not full)
     db.refresh(work_paper)
     
     return work_paper
+
+
+@router.post("/audit-batch", response_model=AuditBatchResponse)
+def trigger_audit_batch(
+    request: AuditBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_sync)
+):
+    """Audit many work papers in one pass, selected by ID and/or status"""
+    if request.work_paper_ids is None and request.status is None:
+        raise HTTPException(status_code=400, detail="Provide work_paper_ids or status")
+    
+    return AuditRunner(db).audit_batch(
+        work_paper_ids=request.work_paper_ids, status=request.status, incremental=request.incremental
+    )
@@ -0,0 +1,73 @@
+"""Bulk import and maintenance from the command line
+
+    python -m app.cli import-work-papers papers.csv --user auditor@example.com
+    python -m app.cli import-attributes rules.jsonl --user manager@example.com
+    python -m app.cli backfill-findings
+
+Prints the result as JSON; imports exit non-zero if any row failed.
+"""
+import argparse
+import json
+import sys
+from app.core.database import SessionLocal, init_db
+from app.models.user import User, UserRole
+from app.services import bulk_import, findings
+import app.models  # noqa: F401
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import work papers or attributes, and maintenance tasks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (
+        ("import-work-papers", "Create work papers submitted by --user"),
+        ("import-attributes", "Create attributes owned by --user, who must be a manager"),
+    ):
+        subparser = subparsers.add_parser(command, help=help_text)
+        subparser.add_argument("path", help="CSV or JSON Lines file")
+        subparser.add_argument("--user", required=True, help="Email of the submitting user")
+        subparser.add_argument("--format", choices=bulk_import.IMPORT_FORMATS, help="Defaults to the file extension")
+        subparser.add_argument("--batch-size", type=int, help="Rows per insert and commit")
+    backfill_parser = subparsers.add_parser(
+        "backfill-findings", help="Write audit_findings rows for conclusions saved before the table existed"
+    )
+    backfill_parser.add_argument("--rebuild", action="store_true", help="Rewrite the rows of every conclusion")
+    backfill_parser.add_argument("--batch-size", type=int, help="Conclusions per commit")
+    args = parser.parse_args(argv)
+
+    if args.command == "backfill-findings":
+        init_db()
+        db = SessionLocal()
+        try:
+            print(json.dumps(findings.backfill(db, rebuild=args.rebuild, batch_size=args.batch_size), indent=2))
+        finally:
+            db.close()
+        return 0
+
+    try:
+        file_format = bulk_import.detect_format(args.path, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+
+    init_db()
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == args.user).first()
+        if user is None:
+            parser.error(f"No user with email {args.user}")
+        if args.command == "import-attributes" and user.role != UserRole.MANAGER:
+            parser.error("Attributes can only be imported by a manager")
+
+        with open(args.path, "rb") as stream:
+            if args.command == "import-work-papers":
+                result = bulk_import.import_work_papers(db, stream, file_format, user.id, args.batch_size)
+            else:
+                result = bulk_import.import_attributes(db, stream, file_format, user.id, args.batch_size)
+    finally:
+        db.close()
+
+    print(json.dumps(result, indent=2))
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,17 +5,56 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./audit_app.db"
+    ASYNC_DATABASE_URL: Optional[str] = None  # Defaults to DATABASE_URL with its async driver, e.g. aiosqlite
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Server databases only
+    DB_POOL_PRE_PING: bool = False  # Server databases only
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL lets readers proceed while an audit writes
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Wait this long for a write lock before "database is locked"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
     
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_TTL_SECONDS: int = 60  # 0 disables the token/user cache
+    AUTH_CACHE_MAX_ENTRIES: int = 1024
     
     # File Upload
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB
+    BLOB_GC_GRACE_SECONDS: int = 3600  # Unreferenced blobs younger than this are kept for in-flight uploads
     ALLOWED_EXTENSIONS: list = [".pdf", ".xlsx", ".xls", ".doc", ".docx", ".jpg", ".jpeg", ".png"]
     
+    # Auditing
+    AUDIT_BATCH_CHUNK_SIZE: int = 500
+    AUDIT_COLUMNAR_MIN_BATCH: int = 64  # Papers audited from scratch together are evaluated column-wise from this size
+    AUDIT_WORKERS: int = 1  # Background audit worker processes started with the API; 0 to run them separately
+    AUDIT_WORKER_POLL_INTERVAL: float = 1.0  # Seconds
+    AUDIT_JOB_STALE_SECONDS: int = 600  # Running jobs without a heartbeat for this long are re-queued
+    AUDIT_JOB_HEARTBEAT_SECONDS: float = 30.0  # How often a running job's heartbeat is refreshed
+    STORE_NARRATIVE_TEXT: bool = True  # False renders conclusion narratives from findings on request
+    PARSE_CACHE_SIZE: int = 65536  # Distinct raw values memoized when parsing dates
+    FORMAT_MAX_VALUE_LENGTH: int = 256  # Longer values fail format rules without running the regex
+    
+    # Bulk import
+    IMPORT_BATCH_SIZE: int = 1000  # Rows per insert and commit
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000  # Failed rows beyond this are counted but not listed
+    
+    # Exports
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per round trip and written per chunk or Parquet row group
+    
+    # Response caching
+    RESPONSE_CACHE_TTL_SECONDS: int = 300  # Serialized detail responses, checked against the ETag; 0 disables
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+    
+    # Metrics
+    METRICS_ENABLED: bool = False  # Serve /metrics and add Server-Timing headers
+    
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,72 @@
+"""ETags and a cache of serialized detail responses
+
+ETags are derived from a row's version column (work paper updated_at, conclusion
+generated_at), so a poll whose If-None-Match still matches is answered with a 304
+after a single-column lookup. Cached bodies are stored with the ETag they were
+rendered for and are only served while it still matches, which keeps them correct
+across processes; writers also drop their entries here to free the memory early.
+"""
+from datetime import datetime
+from typing import Awaitable, Callable, Hashable, Iterable, Optional, Tuple
+from fastapi import Request, Response
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+ETAG_HEADER = "ETag"
+
+# Cache key kinds
+WORK_PAPER = "work-paper"
+CONCLUSION = "conclusion"
+
+_responses = TTLCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+def make_etag(kind: str, row_id: int, version: Optional[datetime]) -> str:
+    stamp = version.isoformat() if version is not None else "0"
+    return f'W/"{kind}-{row_id}-{stamp}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison of If-None-Match against the current ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = _opaque(etag)
+    return any(_opaque(tag) == current for tag in header.split(","))
+
+
+async def conditional_response(
+    request: Request,
+    key: Hashable,
+    etag: str,
+    render: Callable[[], Awaitable[Tuple[str, bytes]]]
+) -> Response:
+    """304 if the client has etag, else the cached body for it, else render and cache one
+
+    render returns the ETag of the row it actually loaded together with the JSON body,
+    so a write landing between the version lookup and the load is never cached stale.
+    """
+    headers = {ETAG_HEADER: etag, "Cache-Control": "no-cache"}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    cached = _responses.get(key)
+    if cached is not None and cached[0] == etag:
+        body = cached[1]
+    else:
+        etag, body = await render()
+        headers[ETAG_HEADER] = etag
+        _responses.set(key, (etag, body))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def invalidate(kind: str, row_ids: Iterable[int]) -> None:
+    for row_id in row_ids:
+        _responses.pop((kind, row_id))
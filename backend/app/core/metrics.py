@@ -0,0 +1,221 @@
+"""Opt-in audit and request metrics in the Prometheus text exposition format
+
+Enabled with METRICS_ENABLED. Values live in process memory, so each API process
+(and each background audit worker) keeps its own; /metrics reports the API process.
+Per-request query counts and audit phase timings are also returned to the caller
+in a Server-Timing header.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from app.core.config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends the charset
+SERVER_TIMING_HEADER = "Server-Timing"
+
+_lock = threading.Lock()
+_registry: List["_Metric"] = []
+
+
+def enabled() -> bool:
+    return settings.METRICS_ENABLED
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with _lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Summary(_Metric):
+    """Count and sum of observations, e.g. seconds spent"""
+
+    kind = "summary"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, count: int = 1, **labels) -> None:
+        """Record value as the total of count observations"""
+        key = self._key(labels)
+        with _lock:
+            totals = self._values.get(key)
+            if totals is None:
+                totals = self._values[key] = [0, 0.0]
+            totals[0] += count
+            totals[1] += value
+
+    def samples(self) -> Iterator[str]:
+        with _lock:
+            items = sorted((key, tuple(totals)) for key, totals in self._values.items())
+        for key, (count, total) in items:
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_count{labels} {count}"
+            yield f"{self.name}_sum{labels} {total}"
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format"""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = Summary(
+    "http_request_duration_seconds", "Time spent handling HTTP requests", ("method", "route")
+)
+HTTP_REQUEST_QUERIES = Summary(
+    "http_request_db_queries", "Database queries issued per HTTP request", ("method", "route")
+)
+DB_QUERY_SECONDS = Summary("db_query_duration_seconds", "Time spent executing database queries")
+AUDIT_PHASE_SECONDS = Summary(
+    "audit_phase_seconds", "Time spent in each audit phase", ("phase",)
+)
+RULE_EVALUATION_SECONDS = Summary(
+    "audit_rule_evaluation_seconds", "Time spent evaluating each attribute's rule", ("attribute_id",)
+)
+RULE_FINDINGS = Counter(
+    "audit_rule_findings_total", "Findings produced per attribute and status", ("attribute_id", "status")
+)
+RULE_REUSED = Counter(
+    "audit_rule_reused_total", "Findings reused from a previous audit per attribute", ("attribute_id",)
+)
+
+
+class RequestStats:
+    """Work done on behalf of one request"""
+
+    __slots__ = ("queries", "query_seconds", "phases")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.phases: Dict[str, float] = {}
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time an audit phase, adding it to the metrics and the current request's breakdown"""
+    if not settings.METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        AUDIT_PHASE_SECONDS.observe(seconds, phase=name)
+        stats = _current.get()
+        if stats is not None:
+            stats.phases[name] = stats.phases.get(name, 0.0) + seconds
+
+
+def observe_rule(attribute_id: int, seconds: float, status: str, count: int = 1) -> None:
+    RULE_EVALUATION_SECONDS.observe(seconds, count, attribute_id=attribute_id)
+    RULE_FINDINGS.inc(count, attribute_id=attribute_id, status=status)
+
+
+def observe_reused(attribute_id: int) -> None:
+    RULE_REUSED.inc(attribute_id=attribute_id)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    seconds = time.perf_counter() - starts.pop()
+    DB_QUERY_SECONDS.observe(seconds)
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += seconds
+
+
+def instrument_engine(engine) -> None:
+    """Count and time every query executed through the engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    entries = [f'db;dur={stats.query_seconds * 1000:.2f};desc="{stats.queries} queries"']
+    entries.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in stats.phases.items())
+    entries.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(entries)
+
+
+async def track_request(request, call_next):
+    """HTTP middleware recording request metrics and setting the Server-Timing header"""
+    stats = RequestStats()
+    token = _current.set(stats)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    seconds = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", "unmatched")
+    HTTP_REQUESTS.inc(method=request.method, route=route_path, status=response.status_code)
+    HTTP_REQUEST_SECONDS.observe(seconds, method=request.method, route=route_path)
+    HTTP_REQUEST_QUERIES.observe(stats.queries, method=request.method, route=route_path)
+    response.headers[SERVER_TIMING_HEADER] = server_timing(stats, seconds)
+    return response
@@ -1,11 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import engine, Base
-from app.api import auth, attributes, work_papers, conclusions
+from app.core import http_cache, metrics
+from app.core.config import settings
+from app.core.database import dispose_async_engine, engine, init_db, on_async_engine
+from app.api import auth, attributes, work_papers, conclusions, audit_jobs, uploads, analytics, metrics as metrics_api
+from app.api.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.services.audit_jobs import AuditWorkerPool
 import os
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and indexes
+init_db()
 
 # Create uploads directory
 os.makedirs("uploads", exist_ok=True)
@@ -19,13 +23,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, metrics.SERVER_TIMING_HEADER, http_cache.ETAG_HEADER],
 )
 
+# Request metrics, DB query counting and Server-Timing headers
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+    on_async_engine(metrics.instrument_engine)
+    app.middleware("http")(metrics.track_request)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(attributes.router, prefix="/api/attributes", tags=["attributes"])
 app.include_router(work_papers.router, prefix="/api/work-papers", tags=["work-papers"])
 app.include_router(conclusions.router, prefix="/api/conclusions", tags=["conclusions"])
+app.include_router(audit_jobs.router, prefix="/api/audit-jobs", tags=["audit-jobs"])
+app.include_router(uploads.router, prefix="/api/uploads", tags=["uploads"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_api.router, tags=["metrics"])
+
+# Background audit workers
+audit_worker_pool = AuditWorkerPool()
+
+
+@app.on_event("startup")
+def start_audit_workers():
+    audit_worker_pool.start()
+
+
+@app.on_event("shutdown")
+def stop_audit_workers():
+    audit_worker_pool.stop()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await dispose_async_engine()
 
 
 @app.get("/")
@@ -2,5 +2,9 @@ from app.models.user import User
 from app.models.audit_attribute import AuditAttribute
 from app.models.work_paper import WorkPaper
 from app.models.conclusion import Conclusion
+from app.models.audit_job import AuditJob
+from app.models.upload_blob import UploadBlob
+from app.models.rule_set import RuleSetVersion
+from app.models.audit_finding import AuditFinding
 
-__all__ = ["User", "AuditAttribute", "WorkPaper", "Conclusion"]
+__all__ = ["User", "AuditAttribute", "WorkPaper", "Conclusion", "AuditJob", "UploadBlob", "RuleSetVersion", "AuditFinding"]
@@ -15,6 +15,7 @@ class RuleType(str, enum.Enum):
     DATE_RANGE = "date_range"
     REQUIRED_FIELD = "required_field"
     FORMAT_VALIDATION = "format_validation"
+    EXPRESSION = "expression"
 
 
 class AuditAttribute(Base):
@@ -27,7 +28,7 @@ class AuditAttribute(Base):
     
     # For validation rules
     rule_type = Column(SQLEnum(RuleType), nullable=True)
-    rule_parameters = Column(JSON, nullable=True)  # e.g., {"field": "balance", "operator": ">", "value": 0}
+    rule_parameters = Column(JSON, nullable=True)  # e.g., {"field": "balance", "operator": ">", "value": 0} or {"expression": "debits == credits"}
     
     # For checklist criteria
     criteria_text = Column(String, nullable=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.core.database import Base
+
+
+class AuditFinding(Base):
+    """One row per finding of a conclusion, mirroring Conclusion.findings for SQL aggregation"""
+    __tablename__ = "audit_findings"
+    __table_args__ = (
+        # Failure counts per attribute, and the papers failing a given attribute
+        Index("ix_audit_findings_attribute_status_work_paper", "attribute_id", "status", "work_paper_id"),
+        Index("ix_audit_findings_work_paper_status", "work_paper_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    conclusion_id = Column(Integer, ForeignKey("conclusions.id"), nullable=False, index=True)
+    work_paper_id = Column(Integer, ForeignKey("work_papers.id"), nullable=False)
+    attribute_id = Column(Integer, nullable=False)  # No foreign key: findings outlive deleted attributes
+    status = Column(String(16), nullable=False)  # pass, fail, warning
@@ -0,0 +1,53 @@
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, JSON, Enum as SQLEnum
+from datetime import datetime
+import enum
+from app.core.database import Base
+
+
+class AuditJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class AuditJob(Base):
+    __tablename__ = "audit_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(SQLEnum(AuditJobStatus), default=AuditJobStatus.QUEUED, nullable=False, index=True)
+    
+    # Selection, same shape as a batch audit request
+    work_paper_ids = Column(JSON, nullable=True)
+    status_filter = Column(String, nullable=True)
+    # Reuse unchanged findings; null on jobs queued before the column existed, treated as true
+    incremental = Column(Boolean, default=True, nullable=True)
+    
+    # Progress
+    total = Column(Integer, default=0, nullable=False)
+    processed = Column(Integer, default=0, nullable=False)
+    missing_ids = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    worker = Column(String, nullable=True)
+    
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    @property
+    def progress(self) -> float:
+        """Fraction of selected work papers processed so far"""
+        if self.status == AuditJobStatus.COMPLETED:
+            return 1.0
+        if not self.total:
+            return 0.0
+        return min(self.processed / self.total, 1.0)
+
+    @property
+    def duration_seconds(self):
+        if self.started_at is None:
+            return None
+        end = self.finished_at or datetime.utcnow()
+        return (end - self.started_at).total_seconds()
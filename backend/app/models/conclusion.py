@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -6,6 +6,9 @@ from app.core.database import Base
 
 class Conclusion(Base):
     __tablename__ = "conclusions"
+    __table_args__ = (
+        Index("ix_conclusions_overall_score_id", "overall_score", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     work_paper_id = Column(Integer, ForeignKey("work_papers.id"), unique=True, nullable=False)
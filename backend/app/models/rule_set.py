@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+
+class RuleSetVersion(Base):
+    """Single row counting changes to the attribute set"""
+    __tablename__ = "rule_set_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)  # Bumped in the same transaction as each attribute change
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+
+class UploadBlob(Base):
+    __tablename__ = "upload_blobs"
+
+    id = Column(String(64), primary_key=True)  # SHA-256 hex digest of the content
+    size = Column(Integer, nullable=False)
+    extension = Column(String, nullable=True)  # Extension of the first upload
+    ref_count = Column(Integer, default=0, nullable=False)  # Work paper file_paths entries pointing here
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -12,6 +12,12 @@ class WorkPaperStatus(str, enum.Enum):
 
 class WorkPaper(Base):
     __tablename__ = "work_papers"
+    __table_args__ = (
+        # Composite with id so filtered listings can use keyset pagination
+        Index("ix_work_papers_status_id", "status", "id"),
+        Index("ix_work_papers_submitted_by_id", "submitted_by", "id"),
+        Index("ix_work_papers_submitted_at_id", "submitted_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -21,6 +27,7 @@ class WorkPaper(Base):
     form_data = Column(JSON, nullable=True)  # Structured form fields
     file_paths = Column(JSON, nullable=True)  # Array of file paths
     status = Column(SQLEnum(WorkPaperStatus), default=WorkPaperStatus.PENDING)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Row version for ETags
 
     # Relationships
     submitter = relationship("User", back_populates="submitted_work_papers")
@@ -1,11 +1,15 @@
 from app.schemas.user import UserCreate, UserResponse, Token, TokenData
 from app.schemas.audit_attribute import AuditAttributeCreate, AuditAttributeUpdate, AuditAttributeResponse
-from app.schemas.work_paper import WorkPaperCreate, WorkPaperResponse
-from app.schemas.conclusion import ConclusionResponse
+from app.schemas.work_paper import WorkPaperCreate, WorkPaperUpdate, WorkPaperResponse, WorkPaperSummary, AuditBatchRequest, AuditBatchResponse
+from app.schemas.conclusion import ConclusionResponse, ConclusionSummary
+from app.schemas.audit_job import AuditJobResponse
+from app.schemas.upload import BlobGarbageCollectionResponse
 
 __all__ = [
     "UserCreate", "UserResponse", "Token", "TokenData",
     "AuditAttributeCreate", "AuditAttributeUpdate", "AuditAttributeResponse",
-    "WorkPaperCreate", "WorkPaperResponse",
-    "ConclusionResponse"
+    "WorkPaperCreate", "WorkPaperUpdate", "WorkPaperResponse", "WorkPaperSummary", "AuditBatchRequest", "AuditBatchResponse",
+    "ConclusionResponse", "ConclusionSummary",
+    "AuditJobResponse",
+    "BlobGarbageCollectionResponse"
 ]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class AttributeFailureRate(BaseModel):
+    attribute_id: int
+    attribute_name: Optional[str] = None  # None once the attribute has been deleted
+    evaluated: int
+    passed: int
+    failed: int
+    warnings: int
+    failure_rate: float  # failed / evaluated
+
+
+class SubmitterFailureRate(BaseModel):
+    submitted_by: int
+    email: Optional[str] = None
+    work_papers: int
+    evaluated: int
+    failed: int
+    warnings: int
+    failure_rate: float  # failed / evaluated
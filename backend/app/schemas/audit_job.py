@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, List
+from app.models.audit_job import AuditJobStatus
+
+
+class AuditJobResponse(BaseModel):
+    id: int
+    status: AuditJobStatus
+    work_paper_ids: Optional[List[int]] = None
+    status_filter: Optional[str] = None
+    incremental: Optional[bool] = None
+    total: int
+    processed: int
+    progress: float
+    missing_ids: Optional[List[int]] = None
+    error: Optional[str] = None
+    created_by: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+
+    class Config:
+        from_attributes = True
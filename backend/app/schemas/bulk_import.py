@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class ImportRowError(BaseModel):
+    line: int  # Line of the row in the uploaded file, starting at 1 (the CSV header is line 1)
+    error: str
+
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError] = []  # The first IMPORT_MAX_REPORTED_ERRORS failures
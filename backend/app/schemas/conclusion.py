@@ -1,7 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
 from typing import List, Any, Optional
 
+# Keys kept on stored findings for re-audits that are not part of the API
+_INTERNAL_FINDING_KEYS = {"fingerprint"}
+
 
 class Finding(BaseModel):
     attribute_id: int
@@ -23,5 +26,25 @@ class ConclusionResponse(ConclusionBase):
     id: int
     generated_at: datetime
 
+    @field_validator("findings")
+    @classmethod
+    def strip_internal_keys(cls, findings):
+        return [
+            {key: value for key, value in finding.items() if key not in _INTERNAL_FINDING_KEYS}
+            for finding in findings
+        ]
+
+    class Config:
+        from_attributes = True
+
+
+class ConclusionSummary(BaseModel):
+    """List projection without findings and narrative text"""
+    id: int
+    work_paper_id: int
+    overall_score: float
+    compliance_summary: Optional[dict[str, Any]] = None
+    generated_at: datetime
+
     class Config:
         from_attributes = True
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class BlobGarbageCollectionResponse(BaseModel):
+    deleted_blobs: int
+    freed_bytes: int
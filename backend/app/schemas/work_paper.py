@@ -14,13 +14,41 @@ class WorkPaperCreate(WorkPaperBase):
     file_paths: Optional[List[str]] = None
 
 
+class WorkPaperUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    form_data: Optional[dict[str, Any]] = None
+
+
 class WorkPaperResponse(WorkPaperBase):
     id: int
     submitted_by: int
-    submitted_at: datetime
+    submitted_at: Optional[datetime] = None
     form_data: Optional[dict[str, Any]] = None
     file_paths: Optional[List[str]] = None
     status: WorkPaperStatus
 
     class Config:
         from_attributes = True
+
+
+class WorkPaperSummary(WorkPaperBase):
+    """List projection without the form_data and file_paths payloads"""
+    id: int
+    submitted_by: int
+    submitted_at: Optional[datetime] = None
+    status: WorkPaperStatus
+
+    class Config:
+        from_attributes = True
+
+
+class AuditBatchRequest(BaseModel):
+    work_paper_ids: Optional[List[int]] = None
+    status: Optional[WorkPaperStatus] = None
+    incremental: bool = True  # Reuse findings whose attribute and inputs are unchanged
+
+
+class AuditBatchResponse(BaseModel):
+    audited: int
+    missing_ids: List[int] = []
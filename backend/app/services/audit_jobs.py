@@ -0,0 +1,217 @@
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.audit_job import AuditJob, AuditJobStatus
+from app.models.work_paper import WorkPaper, WorkPaperStatus
+from app.services.audit_runner import AuditRunner
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_audit_job(
+    db: Session,
+    created_by: int,
+    work_paper_ids: Optional[List[int]] = None,
+    status: Optional[WorkPaperStatus] = None,
+    incremental: bool = True
+) -> AuditJob:
+    """Queue an audit of the selected work papers and return the job immediately"""
+    if work_paper_ids is not None:
+        work_paper_ids = sorted(set(work_paper_ids))
+        total = len(work_paper_ids)
+    else:
+        total = db.query(WorkPaper).filter(WorkPaper.status == status).count()
+
+    job = AuditJob(
+        work_paper_ids=work_paper_ids,
+        status_filter=status.value if status is not None else None,
+        incremental=incremental,
+        total=total,
+        created_by=created_by
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _claimable(stale_before: datetime):
+    return or_(
+        AuditJob.status == AuditJobStatus.QUEUED,
+        and_(AuditJob.status == AuditJobStatus.RUNNING, AuditJob.heartbeat_at < stale_before)
+    )
+
+
+def claim_next_job(db: Session, worker_name: str) -> Optional[AuditJob]:
+    """Atomically take the oldest queued (or abandoned) job for this worker"""
+    now = datetime.utcnow()
+    claimable = _claimable(now - timedelta(seconds=settings.AUDIT_JOB_STALE_SECONDS))
+    candidate = db.query(AuditJob.id).filter(claimable).order_by(AuditJob.id).first()
+    if candidate is None:
+        return None
+
+    # Conditional update: only one worker can move the row out of the claimable state
+    claimed = db.query(AuditJob).filter(AuditJob.id == candidate.id, claimable).update(
+        {
+            AuditJob.status: AuditJobStatus.RUNNING,
+            AuditJob.worker: worker_name,
+            AuditJob.processed: 0,
+            AuditJob.started_at: now,
+            AuditJob.heartbeat_at: now,
+        },
+        synchronize_session=False
+    )
+    db.commit()
+    if claimed != 1:
+        return None
+    return db.query(AuditJob).filter(AuditJob.id == candidate.id).first()
+
+
+class _Heartbeat(threading.Thread):
+    """Refreshes a running job's heartbeat on its own session while the audit runs
+
+    Progress is only written between chunks, so without this a slow chunk would leave
+    the job looking abandoned and another worker would run it again.
+    """
+
+    def __init__(self, job_id: int, worker_name: str, interval: float):
+        super().__init__(name=f"audit-job-{job_id}-heartbeat", daemon=True)
+        self.job_id = job_id
+        self.worker_name = worker_name
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            db = SessionLocal()
+            try:
+                db.query(AuditJob).filter(
+                    AuditJob.id == self.job_id,
+                    AuditJob.status == AuditJobStatus.RUNNING,
+                    AuditJob.worker == self.worker_name
+                ).update({AuditJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+                db.commit()
+            except Exception:
+                logger.exception("Failed to refresh the heartbeat of audit job %s", self.job_id)
+            finally:
+                db.close()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+def run_audit_job(db: Session, job: AuditJob) -> None:
+    """Execute a claimed job, recording progress after every chunk"""
+    job_id = job.id
+    work_paper_ids = job.work_paper_ids
+    status = WorkPaperStatus(job.status_filter) if job.status_filter else None
+    incremental = job.incremental is not False
+
+    def on_progress(processed: int) -> None:
+        db.query(AuditJob).filter(AuditJob.id == job_id).update(
+            {AuditJob.processed: processed, AuditJob.heartbeat_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+
+    heartbeat = _Heartbeat(job_id, job.worker, settings.AUDIT_JOB_HEARTBEAT_SECONDS)
+    heartbeat.start()
+    try:
+        result = AuditRunner(db).audit_batch(
+            work_paper_ids=work_paper_ids, status=status, incremental=incremental, on_progress=on_progress
+        )
+    except Exception as e:
+        logger.exception("Audit job %s failed", job_id)
+        db.rollback()
+        values = {AuditJob.status: AuditJobStatus.FAILED, AuditJob.error: str(e)}
+    else:
+        processed = result["audited"] + len(result["missing_ids"])
+        values = {
+            AuditJob.status: AuditJobStatus.COMPLETED,
+            AuditJob.processed: processed,
+            AuditJob.missing_ids: result["missing_ids"],
+        }
+        if status is not None:
+            # Papers matching the filter may have arrived after the job was queued
+            values[AuditJob.total] = processed
+
+    finally:
+        heartbeat.stop()
+
+    values[AuditJob.finished_at] = datetime.utcnow()
+    db.query(AuditJob).filter(AuditJob.id == job_id).update(values, synchronize_session=False)
+    db.commit()
+
+
+def run_worker(worker_name: str, stop_event=None, poll_interval: Optional[float] = None) -> None:
+    """Poll the job table and execute jobs until stop_event is set"""
+    import app.models  # noqa: F401 - register every mapper in spawned processes
+
+    poll_interval = poll_interval if poll_interval is not None else settings.AUDIT_WORKER_POLL_INTERVAL
+    db = SessionLocal()
+    logger.info("Audit worker %s started", worker_name)
+    try:
+        while stop_event is None or not stop_event.is_set():
+            try:
+                job = claim_next_job(db, worker_name)
+                if job is not None:
+                    run_audit_job(db, job)
+                    continue
+            except Exception:
+                logger.exception("Audit worker %s failed to process the queue", worker_name)
+                db.rollback()
+
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+    finally:
+        db.close()
+        logger.info("Audit worker %s stopped", worker_name)
+
+
+class AuditWorkerPool:
+    """Local pool of worker processes consuming the audit job table"""
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = settings.AUDIT_WORKERS if size is None else size
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = None
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self) -> None:
+        if self._processes or self.size <= 0:
+            return
+        self._stop_event = self._context.Event()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for index in range(self.size):
+            process = self._context.Process(
+                target=run_worker,
+                args=(f"{prefix}:{index}", self._stop_event),
+                name=f"audit-worker-{index}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if not self._processes:
+            return
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._processes = []
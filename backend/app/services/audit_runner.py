@@ -0,0 +1,171 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List, Optional, Iterator, Callable
+from datetime import datetime
+from app.core import http_cache, metrics
+from app.core.config import settings
+from app.models.conclusion import Conclusion
+from app.models.work_paper import WorkPaper, WorkPaperStatus
+from app.services.audit_engine import AuditEngine
+from app.services import findings as findings_store
+from app.services.conclusion_generator import ConclusionGenerator
+
+
+class AuditRunner:
+    """Audits work papers and persists their conclusions in bulk"""
+
+    def __init__(self, db: Session, chunk_size: Optional[int] = None):
+        self.db = db
+        self.chunk_size = chunk_size or settings.AUDIT_BATCH_CHUNK_SIZE
+        self.engine = AuditEngine(db)
+        self.generator = ConclusionGenerator(db)
+
+    def audit_work_papers(
+        self,
+        work_papers: List[WorkPaper],
+        incremental: bool = True,
+        changed_fields: Optional[set] = None
+    ) -> int:
+        """Audit loaded work papers, patch or create their conclusions and commit once
+
+        With incremental, findings whose fingerprint is unchanged are reused and
+        conclusions whose findings are all unchanged are left untouched. changed_fields
+        tells the engine that only those form fields changed since the last audit.
+        """
+        if not work_papers:
+            return 0
+
+        ids = [work_paper.id for work_paper in work_papers]
+        with metrics.phase("load_paper"):
+            existing = {
+                work_paper_id: (conclusion_id, findings)
+                for conclusion_id, work_paper_id, findings in self.db.query(
+                    Conclusion.id, Conclusion.work_paper_id, Conclusion.findings
+                ).filter(Conclusion.work_paper_id.in_(ids))
+            }
+
+        # Papers without usable previous findings are evaluated together, column-wise when large
+        results: Dict[int, Dict[str, Any]] = {}
+        fresh = [
+            work_paper for work_paper in work_papers
+            if not incremental or work_paper.id not in existing
+        ]
+        # Build the plan first so compiling it is timed as load_attributes, not evaluate
+        self.engine.plan
+        with metrics.phase("evaluate"):
+            for work_paper, audit_results in zip(fresh, self.engine.evaluate_work_papers(fresh)):
+                results[work_paper.id] = audit_results
+
+        generated_at = datetime.utcnow()
+        new_rows = []
+        patched_rows = []
+        written_findings = {}
+        for work_paper in work_papers:
+            conclusion_id, previous_findings = existing.get(work_paper.id, (None, None))
+            if not incremental:
+                previous_findings = None
+            audit_results = results.get(work_paper.id)
+            if audit_results is None:
+                with metrics.phase("evaluate"):
+                    audit_results = self.engine.evaluate_work_paper(work_paper, previous_findings, changed_fields)
+            if previous_findings is not None and \
+                    audit_results["reused"] == len(audit_results["findings"]) == len(previous_findings):
+                continue
+
+            with metrics.phase("generate_conclusion"):
+                conclusion_data = self.generator.generate_conclusion(work_paper.id, audit_results)
+            row = {
+                "generated_at": generated_at,
+                "overall_score": conclusion_data["overall_score"],
+                "compliance_summary": conclusion_data["compliance_summary"],
+                "findings": conclusion_data["findings"],
+                "cpa_conclusion_text": conclusion_data["cpa_conclusion_text"]
+            }
+            written_findings[work_paper.id] = conclusion_data["findings"]
+            if conclusion_id is None:
+                row["work_paper_id"] = work_paper.id
+                new_rows.append(row)
+            else:
+                row["id"] = conclusion_id
+                patched_rows.append(row)
+
+        with metrics.phase("commit"):
+            if patched_rows:
+                self.db.execute(update(Conclusion), patched_rows)
+            if new_rows:
+                self.db.execute(insert(Conclusion), new_rows)
+            conclusion_ids = {
+                work_paper_id: existing[work_paper_id][0]
+                for work_paper_id in written_findings if work_paper_id in existing
+            }
+            if new_rows:
+                conclusion_ids.update(self.db.execute(
+                    select(Conclusion.work_paper_id, Conclusion.id).where(
+                        Conclusion.work_paper_id.in_([row["work_paper_id"] for row in new_rows])
+                    )
+                ).all())
+            findings_store.replace_findings(self.db, [
+                (conclusion_ids[work_paper_id], work_paper_id, findings)
+                for work_paper_id, findings in written_findings.items()
+            ])
+            self.db.execute(
+                update(WorkPaper).where(WorkPaper.id.in_(ids)).values(status=WorkPaperStatus.AUDITED)
+            )
+            self.db.commit()
+        http_cache.invalidate(http_cache.WORK_PAPER, ids)
+        http_cache.invalidate(http_cache.CONCLUSION, [row["id"] for row in patched_rows])
+        return len(work_papers)
+
+    def audit_batch(
+        self,
+        work_paper_ids: Optional[List[int]] = None,
+        status: Optional[WorkPaperStatus] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        incremental: bool = True
+    ) -> Dict[str, Any]:
+        """Audit the selected work papers chunk by chunk, one transaction per chunk"""
+        audited = 0
+        missing_ids: List[int] = []
+
+        for requested_ids, work_papers in self._iter_chunks(work_paper_ids, status):
+            audited += self.audit_work_papers(work_papers, incremental=incremental)
+            if requested_ids is not None:
+                found = {work_paper.id for work_paper in work_papers}
+                missing_ids.extend(i for i in requested_ids if i not in found)
+            if on_progress is not None:
+                on_progress(audited + len(missing_ids))
+
+        return {"audited": audited, "missing_ids": missing_ids}
+
+    def _iter_chunks(
+        self,
+        work_paper_ids: Optional[List[int]],
+        status: Optional[WorkPaperStatus]
+    ) -> Iterator[tuple]:
+        query = self.db.query(WorkPaper)
+        if status is not None:
+            query = query.filter(WorkPaper.status == status)
+
+        if work_paper_ids is not None:
+            ids = sorted(set(work_paper_ids))
+            for start in range(0, len(ids), self.chunk_size):
+                chunk = ids[start:start + self.chunk_size]
+                with metrics.phase("load_paper"):
+                    work_papers = query.filter(WorkPaper.id.in_(chunk)).order_by(WorkPaper.id).all()
+                yield chunk, work_papers
+            return
+
+        # Keyset over the primary key so committed chunks never shift later pages
+        last_id = 0
+        while True:
+            with metrics.phase("load_paper"):
+                work_papers = (
+                    query.filter(WorkPaper.id > last_id)
+                    .order_by(WorkPaper.id)
+                    .limit(self.chunk_size)
+                    .all()
+                )
+            if not work_papers:
+                return
+            yield None, work_papers
+            last_id = work_papers[-1].id
@@ -0,0 +1,213 @@
+"""Bulk import of work papers and attributes from CSV or JSON Lines
+
+Files are read as a stream and every row is validated with the same schema as the
+single-record endpoints. Valid rows are inserted in batches, one executemany and one
+commit per batch. A row that fails validation or insertion is reported with its line
+number and the rest of the batch is still imported.
+"""
+import csv
+import io
+import json
+import os
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.audit_attribute import AuditAttribute
+from app.models.work_paper import WorkPaper, WorkPaperStatus
+from app.schemas.audit_attribute import AuditAttributeCreate
+from app.schemas.work_paper import WorkPaperCreate
+from app.services import rule_compiler, rule_set
+
+IMPORT_FORMATS = ("csv", "jsonl")
+_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+# CSV cells holding JSON rather than plain text
+_JSON_COLUMNS = {"form_data", "file_paths", "rule_parameters"}
+
+# (line, record, error); record is None when the row could not be parsed
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def detect_format(filename: Optional[str], requested: Optional[str] = None) -> str:
+    """The requested format, or the one implied by the file extension"""
+    if requested is not None:
+        if requested not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format '{requested}'; expected one of: {', '.join(IMPORT_FORMATS)}")
+        return requested
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in _EXTENSIONS:
+        raise ValueError("Cannot tell the import format from the file name; pass format=csv or format=jsonl")
+    return _EXTENSIONS[extension]
+
+
+def iter_records(text, file_format: str) -> Iterator[Record]:
+    if file_format == "csv":
+        return _iter_csv(text)
+    return _iter_jsonl(text)
+
+
+def _iter_jsonl(text) -> Iterator[Record]:
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except json.JSONDecodeError as e:
+            yield line, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line, None, "Each line must be a JSON object"
+            continue
+        yield line, record, None
+
+
+def _iter_csv(text) -> Iterator[Record]:
+    reader = csv.DictReader(text)
+    for row in reader:
+        line = reader.line_num
+        if None in row:
+            yield line, None, "Row has more fields than the header"
+            continue
+        record = {}
+        error = None
+        for column, value in row.items():
+            # Empty cells are left out so schema defaults apply
+            if value is None or value == "":
+                continue
+            if column in _JSON_COLUMNS:
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError as e:
+                    error = f"{column}: invalid JSON ({e.msg})"
+                    break
+            record[column] = value
+        yield line, (None if error else record), error
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    return str(error)
+
+
+class _Importer:
+    """Validates records into column dicts and inserts them batch by batch"""
+
+    def __init__(self, db: Session, model, schema: type, to_row: Callable[[BaseModel], Dict[str, Any]],
+                 after_batch: Optional[Callable[[Session], None]] = None, batch_size: Optional[int] = None):
+        self.db = db
+        self.model = model
+        self.schema = schema
+        self.to_row = to_row
+        self.after_batch = after_batch
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def run(self, records: Iterator[Record]) -> Dict[str, Any]:
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        for line, record, error in records:
+            if error is None:
+                try:
+                    batch.append((line, self.to_row(self.schema.model_validate(record))))
+                except ValueError as e:  # Includes pydantic's ValidationError
+                    error = _describe(e)
+            if error is not None:
+                self._fail(line, error)
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+        return {"imported": self.imported, "failed": self.failed, "errors": self.errors}
+
+    def _fail(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def _flush(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        try:
+            self.db.execute(insert(self.model), [row for _, row in batch])
+            self._commit(len(batch))
+            return
+        except SQLAlchemyError:
+            self.db.rollback()
+
+        # Retry row by row so only the rows the database rejects are lost
+        inserted = 0
+        for line, row in batch:
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(self.model), [row])
+            except SQLAlchemyError as e:
+                self._fail(line, str(getattr(e, "orig", None) or e))
+                continue
+            inserted += 1
+        self._commit(inserted)
+
+    def _commit(self, inserted: int) -> None:
+        if inserted and self.after_batch is not None:
+            self.after_batch(self.db)
+        self.db.commit()
+        self.imported += inserted
+
+
+def _import(importer: _Importer, stream: BinaryIO, file_format: str) -> Dict[str, Any]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        return importer.run(iter_records(text, file_format))
+    finally:
+        # Leave the underlying stream open for its owner
+        text.detach()
+
+
+def import_work_papers(db: Session, stream: BinaryIO, file_format: str, submitted_by: int,
+                       batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """Create pending work papers from a CSV or JSON Lines stream
+
+    Files cannot be imported: they are attached through the upload endpoints, which
+    store the blobs and count their references.
+    """
+    def to_row(work_paper: WorkPaperCreate) -> Dict[str, Any]:
+        if work_paper.file_paths:
+            raise ValueError("file_paths: files cannot be imported; upload them to the work paper instead")
+        return {
+            "title": work_paper.title,
+            "description": work_paper.description,
+            "form_data": work_paper.form_data,
+            "submitted_by": submitted_by,
+            "status": WorkPaperStatus.PENDING
+        }
+
+    importer = _Importer(db, WorkPaper, WorkPaperCreate, to_row, batch_size=batch_size)
+    return _import(importer, stream, file_format)
+
+
+def import_attributes(db: Session, stream: BinaryIO, file_format: str, created_by: int,
+                      batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """Create attributes from a CSV or JSON Lines stream, bumping the rule-set version per batch"""
+    def to_row(attribute: AuditAttributeCreate) -> Dict[str, Any]:
+        rule_compiler.check_rule(attribute.rule_type, attribute.rule_parameters)
+        return {
+            "name": attribute.name,
+            "description": attribute.description,
+            "attribute_type": attribute.attribute_type,
+            "rule_type": attribute.rule_type,
+            "rule_parameters": attribute.rule_parameters,
+            "criteria_text": attribute.criteria_text,
+            "is_required": attribute.is_required,
+            "created_by": created_by
+        }
+
+    importer = _Importer(
+        db, AuditAttribute, AuditAttributeCreate, to_row, after_batch=rule_set.bump_version, batch_size=batch_size
+    )
+    return _import(importer, stream, file_format)
@@ -0,0 +1,206 @@
+"""Streaming export of conclusions and their flattened findings
+
+Rows are read with yield_per on a session owned by the export, selecting plain
+columns rather than ORM objects, and written out one batch at a time as CSV, JSON
+Lines or Parquet, so memory use does not grow with the number of conclusions.
+Parquet needs the optional pyarrow package.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, NamedTuple, Optional, Tuple
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.conclusion import Conclusion
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+# Parquet is only offered when pyarrow is installed
+EXPORT_FORMATS = ("csv", "jsonl", "parquet") if pa is not None else ("csv", "jsonl")
+ExportFormat = Literal[EXPORT_FORMATS]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportColumn(NamedTuple):
+    name: str
+    arrow_type: str  # pyarrow type factory name, e.g. "int64"
+
+
+CONCLUSION_COLUMNS = (
+    ExportColumn("conclusion_id", "int64"),
+    ExportColumn("work_paper_id", "int64"),
+    ExportColumn("generated_at", "timestamp"),
+    ExportColumn("overall_score", "float64"),
+    ExportColumn("total_attributes", "int64"),
+    ExportColumn("passed", "int64"),
+    ExportColumn("failed", "int64"),
+    ExportColumn("warnings", "int64"),
+)
+
+FINDING_COLUMNS = (
+    ExportColumn("conclusion_id", "int64"),
+    ExportColumn("work_paper_id", "int64"),
+    ExportColumn("generated_at", "timestamp"),
+    ExportColumn("attribute_id", "int64"),
+    ExportColumn("attribute_name", "string"),
+    ExportColumn("status", "string"),
+    ExportColumn("details", "string"),
+    ExportColumn("recommendation", "string"),
+)
+
+
+def _filtered(stmt, generated_from: Optional[datetime], generated_to: Optional[datetime]):
+    if generated_from is not None:
+        stmt = stmt.where(Conclusion.generated_at >= generated_from)
+    if generated_to is not None:
+        stmt = stmt.where(Conclusion.generated_at <= generated_to)
+    return stmt.order_by(Conclusion.id)
+
+
+def _iter_rows(stmt) -> Iterator[Tuple]:
+    """Stream result rows on a dedicated session, since the response outlives the request's"""
+    db = SessionLocal()
+    try:
+        yield from db.execute(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    finally:
+        db.close()
+
+
+def conclusion_rows(generated_from: Optional[datetime] = None,
+                    generated_to: Optional[datetime] = None) -> Iterator[Tuple]:
+    stmt = _filtered(select(
+        Conclusion.id, Conclusion.work_paper_id, Conclusion.generated_at,
+        Conclusion.overall_score, Conclusion.compliance_summary
+    ), generated_from, generated_to)
+    for conclusion_id, work_paper_id, generated_at, overall_score, summary in _iter_rows(stmt):
+        summary = summary or {}
+        yield (
+            conclusion_id, work_paper_id, generated_at, overall_score,
+            summary.get("total_attributes"), summary.get("passed"), summary.get("failed"), summary.get("warnings")
+        )
+
+
+def finding_rows(generated_from: Optional[datetime] = None, generated_to: Optional[datetime] = None,
+                 status: Optional[str] = None) -> Iterator[Tuple]:
+    """One row per finding; status keeps only findings with that status"""
+    stmt = _filtered(select(
+        Conclusion.id, Conclusion.work_paper_id, Conclusion.generated_at, Conclusion.findings
+    ), generated_from, generated_to)
+    for conclusion_id, work_paper_id, generated_at, findings in _iter_rows(stmt):
+        for finding in findings or []:
+            if status is not None and finding.get("status") != status:
+                continue
+            yield (
+                conclusion_id, work_paper_id, generated_at, finding.get("attribute_id"),
+                finding.get("attribute_name"), finding.get("status"), finding.get("details"),
+                finding.get("recommendation")
+            )
+
+
+def _batches(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_csv(columns, rows: Iterable[Tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column.name for column in columns)
+    for batch in _batches(rows, settings.EXPORT_BATCH_SIZE):
+        writer.writerows(
+            tuple(value.isoformat() if isinstance(value, datetime) else value for value in row)
+            for row in batch
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _write_jsonl(columns, rows: Iterable[Tuple]) -> Iterator[bytes]:
+    names = [column.name for column in columns]
+    encode = json.JSONEncoder(ensure_ascii=False, default=lambda value: value.isoformat()).encode
+    for batch in _batches(rows, settings.EXPORT_BATCH_SIZE):
+        yield "".join(encode(dict(zip(names, row))) + "\n" for row in batch).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting what pyarrow writes so it can be streamed out"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(columns):
+    return pa.schema([
+        (column.name, pa.timestamp("us") if column.arrow_type == "timestamp" else getattr(pa, column.arrow_type)())
+        for column in columns
+    ])
+
+
+def _write_parquet(columns, rows: Iterable[Tuple]) -> Iterator[bytes]:
+    """One row group per batch, streamed out as soon as it is written"""
+    schema = _arrow_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in _batches(rows, settings.EXPORT_BATCH_SIZE):
+            arrays = [
+                pa.array([row[position] for row in batch], type=schema.field(position).type)
+                for position in range(len(columns))
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+_WRITERS: Dict[str, Callable[..., Iterator[bytes]]] = {
+    "csv": _write_csv,
+    "jsonl": _write_jsonl,
+    "parquet": _write_parquet,
+}
+
+
+def export(columns, rows: Iterable[Tuple], file_format: str) -> Iterator[bytes]:
+    """Encode rows with the given columns as a stream of byte chunks; file_format is one of EXPORT_FORMATS"""
+    return _WRITERS[file_format](columns, rows)
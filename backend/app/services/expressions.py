@@ -0,0 +1,387 @@
+"""Safe expression language for EXPRESSION rules
+
+An expression such as ``debits == credits and balance > 0`` is parsed once with a
+small Pratt parser into nested closures and cached by its text, so evaluation is a
+chain of Python calls with no ``eval``. Supported syntax:
+
+- literals: numbers, 'strings' or "strings", true, false, null, [lists]
+- field references: bare names (``balance``) or braces for other names (``{Total Due}``)
+- arithmetic ``+ - * / %``, comparisons ``== != < <= > >=``, ``in``, ``and or not``
+- functions: abs, round, min, max, len, date, present(field)
+
+A string compared with a number is converted to a number, a value compared with a
+date() is parsed as a date, and subtracting two dates gives days. Comparisons with
+null are false. Keywords are case-insensitive.
+"""
+import ast
+import operator
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from app.services.parsers import parse_date
+
+MAX_EXPRESSION_LENGTH = 2000
+MAX_DEPTH = 64
+
+Node = Callable[[Dict[str, Any]], Any]
+
+
+class ExpressionError(ValueError):
+    """The expression text is not valid"""
+
+
+class EvaluationError(Exception):
+    """The work paper's values cannot satisfy the expression"""
+
+
+class MissingFieldError(EvaluationError):
+    def __init__(self, field: str):
+        super().__init__(f"Field '{field}' not found in work paper")
+        self.field = field
+
+
+class CompiledExpression(NamedTuple):
+    text: str
+    evaluate: Node
+    fields: Tuple[str, ...]
+
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<field>\{[^{}]+\})
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op>==|!=|<=|>=|&&|\|\||[-+*/%<>!(),\[\]])
+    )""", re.VERBOSE)
+
+_KEYWORD_OPS = {"and": "and", "or": "or", "not": "not", "in": "in"}
+_SYMBOL_OPS = {"&&": "and", "||": "or", "!": "not"}
+_CONSTANTS = {"true": True, "false": False, "null": None}
+
+# Left binding power of infix operators
+_INFIX_POWER = {
+    "or": 10, "and": 20,
+    "==": 40, "!=": 40, "<": 40, "<=": 40, ">": 40, ">=": 40, "in": 40,
+    "+": 50, "-": 50,
+    "*": 60, "/": 60, "%": 60,
+}
+_NOT_POWER = 30
+_NEGATE_POWER = 70
+
+
+class _Token(NamedTuple):
+    kind: str
+    value: Any
+    position: int
+
+
+def _tokenize(text: str) -> List[_Token]:
+    tokens = []
+    position = 0
+    end = len(text.rstrip())
+    while position < end:
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise ExpressionError(f"Unexpected character at position {position}: {text[position]!r}")
+        kind = match.lastgroup
+        raw = match.group(kind)
+        start = match.start(kind)
+        if kind == "number":
+            value = float(raw) if any(c in raw for c in ".eE") else int(raw)
+            tokens.append(_Token("literal", value, start))
+        elif kind == "string":
+            try:
+                value = ast.literal_eval(raw)
+            except (SyntaxError, ValueError) as e:
+                raise ExpressionError(f"Invalid string at position {start}: {getattr(e, 'msg', None) or e}")
+            tokens.append(_Token("literal", value, start))
+        elif kind == "field":
+            tokens.append(_Token("field", raw[1:-1].strip(), start))
+        elif kind == "name":
+            lowered = raw.lower()
+            if lowered in _KEYWORD_OPS:
+                tokens.append(_Token("op", _KEYWORD_OPS[lowered], start))
+            elif lowered in _CONSTANTS:
+                tokens.append(_Token("literal", _CONSTANTS[lowered], start))
+            else:
+                tokens.append(_Token("name", raw, start))
+        else:
+            tokens.append(_Token("op", _SYMBOL_OPS.get(raw, raw), start))
+        position = match.end()
+    tokens.append(_Token("end", None, end))
+    return tokens
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float))
+
+
+def _number(value: Any) -> Any:
+    if _is_number(value):
+        return value
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        raise EvaluationError(f"Value '{value}' is not numeric")
+
+
+def _as_date(value: Any) -> date:
+    parsed = parse_date(value)
+    if parsed is None:
+        raise EvaluationError(f"Value '{value}' is not a valid date")
+    return parsed
+
+
+def _coerce_pair(left: Any, right: Any) -> Tuple[Any, Any]:
+    """Bring both sides of a comparison to a common type"""
+    if isinstance(left, date) or isinstance(right, date):
+        return _as_date(left), _as_date(right)
+    if _is_number(left) or _is_number(right):
+        return _number(left), _number(right)
+    return left, right
+
+
+def _compare(compare: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    def apply(left, right):
+        if left is None or right is None:
+            return False
+        left, right = _coerce_pair(left, right)
+        try:
+            return compare(left, right)
+        except TypeError:
+            raise EvaluationError(f"Cannot compare '{left}' with '{right}'")
+    return apply
+
+
+def _equals(left: Any, right: Any) -> bool:
+    if left is None or right is None:
+        return left is right
+    try:
+        left, right = _coerce_pair(left, right)
+    except EvaluationError:
+        return False
+    return left == right
+
+
+def _subtract(left: Any, right: Any) -> Any:
+    if isinstance(left, date) and isinstance(right, date):
+        return (left - right).days
+    return _number(left) - _number(right)
+
+
+def _divide(left: Any, right: Any) -> Any:
+    right = _number(right)
+    if right == 0:
+        raise EvaluationError("Division by zero")
+    return _number(left) / right
+
+
+def _modulo(left: Any, right: Any) -> Any:
+    right = _number(right)
+    if right == 0:
+        raise EvaluationError("Division by zero")
+    return _number(left) % right
+
+
+def _contains(left: Any, right: Any) -> bool:
+    if isinstance(right, (list, tuple)):
+        return any(_equals(left, item) for item in right)
+    if isinstance(right, str) and isinstance(left, str):
+        return left in right
+    raise EvaluationError(f"Cannot test membership in '{right}'")
+
+
+_BINARY: Dict[str, Callable[[Any, Any], Any]] = {
+    "==": _equals,
+    "!=": lambda left, right: not _equals(left, right),
+    "<": _compare(operator.lt),
+    "<=": _compare(operator.le),
+    ">": _compare(operator.gt),
+    ">=": _compare(operator.ge),
+    "in": _contains,
+    "+": lambda left, right: _number(left) + _number(right),
+    "-": _subtract,
+    "*": lambda left, right: _number(left) * _number(right),
+    "/": _divide,
+    "%": _modulo,
+}
+
+
+def _length(value: Any) -> int:
+    if not isinstance(value, (str, list, dict)):
+        raise EvaluationError(f"Value '{value}' has no length")
+    return len(value)
+
+
+_FUNCTIONS: Dict[str, Tuple[Callable[..., Any], int, Optional[int]]] = {
+    # name: (function, min args, max args)
+    "abs": (lambda value: abs(_number(value)), 1, 1),
+    "round": (lambda value, digits=0: round(_number(value), int(_number(digits))), 1, 2),
+    "min": (lambda *values: min(_number(value) for value in values), 1, None),
+    "max": (lambda *values: max(_number(value) for value in values), 1, None),
+    "len": (_length, 1, 1),
+    "date": (_as_date, 1, 1),
+}
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.index = 0
+        self.depth = 0
+        self.fields: Dict[str, None] = {}
+
+    def peek(self) -> _Token:
+        return self.tokens[self.index]
+
+    def advance(self) -> _Token:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        token = self.advance()
+        if token.kind != "op" or token.value != value:
+            raise self.error(token, f"expected '{value}'")
+
+    def error(self, token: _Token, message: str) -> ExpressionError:
+        found = "end of expression" if token.kind == "end" else repr(self.text[token.position:token.position + 10])
+        return ExpressionError(f"{message[0].upper()}{message[1:]} at position {token.position}, found {found}")
+
+    def parse(self) -> Node:
+        node = self.expression(0)
+        token = self.peek()
+        if token.kind != "end":
+            raise self.error(token, "unexpected token")
+        return node
+
+    def expression(self, min_power: int) -> Node:
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise ExpressionError(f"Expression is nested more than {MAX_DEPTH} levels deep")
+        left = self.prefix(self.advance())
+        while True:
+            token = self.peek()
+            power = _INFIX_POWER.get(token.value) if token.kind == "op" else None
+            if power is None or power <= min_power:
+                break
+            self.advance()
+            left = self.infix(token.value, left, self.expression(power))
+        self.depth -= 1
+        return left
+
+    def prefix(self, token: _Token) -> Node:
+        if token.kind == "literal":
+            value = token.value
+            return lambda form_data: value
+        if token.kind == "field":
+            return self.field(token.value)
+        if token.kind == "name":
+            if self.peek().kind == "op" and self.peek().value == "(":
+                self.advance()
+                return self.call(token)
+            return self.field(token.value)
+        if token.kind == "op":
+            if token.value == "(":
+                node = self.expression(0)
+                self.expect(")")
+                return node
+            if token.value == "[":
+                return self.list_literal()
+            if token.value == "not":
+                operand = self.expression(_NOT_POWER)
+                return lambda form_data: not operand(form_data)
+            if token.value == "-":
+                operand = self.expression(_NEGATE_POWER)
+                return lambda form_data: -_number(operand(form_data))
+            if token.value == "+":
+                operand = self.expression(_NEGATE_POWER)
+                return lambda form_data: _number(operand(form_data))
+        raise self.error(token, "expected a value")
+
+    def infix(self, op: str, left: Node, right: Node) -> Node:
+        if op == "and":
+            return lambda form_data: bool(left(form_data)) and bool(right(form_data))
+        if op == "or":
+            return lambda form_data: bool(left(form_data)) or bool(right(form_data))
+        apply = _BINARY[op]
+        return lambda form_data: apply(left(form_data), right(form_data))
+
+    def field(self, name: str) -> Node:
+        self.fields[name] = None
+
+        def load(form_data):
+            try:
+                return form_data[name]
+            except KeyError:
+                raise MissingFieldError(name)
+        return load
+
+    def arguments(self) -> List[Node]:
+        arguments = []
+        if self.peek().kind == "op" and self.peek().value == ")":
+            self.advance()
+            return arguments
+        while True:
+            arguments.append(self.expression(0))
+            token = self.advance()
+            if token.kind == "op" and token.value == ")":
+                return arguments
+            if token.kind != "op" or token.value != ",":
+                raise self.error(token, "expected ',' or ')'")
+
+    def call(self, name_token: _Token) -> Node:
+        name = name_token.value.lower()
+        if name == "present":
+            token = self.advance()
+            if token.kind not in ("name", "field"):
+                raise self.error(token, "expected a field name in present()")
+            self.expect(")")
+            field = token.value
+            self.fields[field] = None
+            return lambda form_data: form_data.get(field) not in (None, "")
+
+        if name not in _FUNCTIONS:
+            raise self.error(name_token, f"unknown function '{name_token.value}'")
+        function, min_args, max_args = _FUNCTIONS[name]
+        nodes = tuple(self.arguments())
+        if len(nodes) < min_args or (max_args is not None and len(nodes) > max_args):
+            raise self.error(name_token, f"wrong number of arguments for {name}()")
+        if len(nodes) == 1:
+            only = nodes[0]
+            return lambda form_data: function(only(form_data))
+        return lambda form_data: function(*(node(form_data) for node in nodes))
+
+    def list_literal(self) -> Node:
+        nodes = []
+        if self.peek().kind == "op" and self.peek().value == "]":
+            self.advance()
+        else:
+            while True:
+                nodes.append(self.expression(0))
+                token = self.advance()
+                if token.kind == "op" and token.value == "]":
+                    break
+                if token.kind != "op" or token.value != ",":
+                    raise self.error(token, "expected ',' or ']'")
+        nodes = tuple(nodes)
+        return lambda form_data: [node(form_data) for node in nodes]
+
+
+def compile_expression(text: Any) -> CompiledExpression:
+    """Parse an expression once into a callable over form data; raises ExpressionError"""
+    if not isinstance(text, str) or not text.strip():
+        raise ExpressionError("Expression must be a non-empty string")
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+    return _compile(text)
+
+
+@lru_cache(maxsize=1024)
+def _compile(text: str) -> CompiledExpression:
+    parser = _Parser(text)
+    evaluate = parser.parse()
+    return CompiledExpression(text, evaluate, tuple(parser.fields))
@@ -0,0 +1,179 @@
+import hashlib
+import os
+import re
+import time
+import uuid
+from collections import Counter
+from typing import BinaryIO, Dict, Iterable, NamedTuple, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.upload_blob import UploadBlob
+from app.models.work_paper import WorkPaper
+
+BLOB_DIR = "blobs"
+_BLOB_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+class FileTooLargeError(Exception):
+    pass
+
+
+class StoredFile(NamedTuple):
+    blob_id: str  # Value stored in WorkPaper.file_paths
+    size: int
+    sha256: str
+    extension: Optional[str] = None
+
+
+def stream_to_file(source: BinaryIO, destination: str, max_size: int, chunk_size: int = None) -> tuple:
+    """Copy source to destination in fixed-size chunks, returning (size, sha256 hex digest)
+
+    Aborts as soon as max_size is exceeded and removes the partial file on any error.
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(destination, "wb") as out:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLargeError(f"File exceeds {max_size} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        remove_quietly(destination)
+        raise
+    return size, digest.hexdigest()
+
+
+def hash_stream(source: BinaryIO, max_size: int, chunk_size: int = None) -> tuple:
+    """Read source in chunks without writing it, returning (size, sha256 hex digest)"""
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise FileTooLargeError(f"File exceeds {max_size} bytes")
+        digest.update(chunk)
+    return size, digest.hexdigest()
+
+
+def remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def is_blob_id(value: str) -> bool:
+    return bool(_BLOB_ID.match(value))
+
+
+def blob_path(blob_id: str) -> str:
+    """Absolute location of a blob, sharded by the first two bytes of its hash"""
+    return os.path.join(settings.UPLOAD_DIR, BLOB_DIR, blob_id[:2], blob_id[2:4], blob_id)
+
+
+def store_blob(source: BinaryIO, extension: Optional[str], max_size: int) -> StoredFile:
+    """Store content once under its SHA-256, skipping the write when it already exists"""
+    if source.seekable():
+        size, sha256 = hash_stream(source, max_size)
+        path = blob_path(sha256)
+        if os.path.exists(path):
+            # Refresh mtime so garbage collection treats the blob as in use
+            os.utime(path)
+            return StoredFile(sha256, size, sha256, extension)
+        source.seek(0)
+
+    tmp_dir = os.path.join(settings.UPLOAD_DIR, BLOB_DIR, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+    size, sha256 = stream_to_file(source, tmp_path, max_size)
+
+    path = blob_path(sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        remove_quietly(tmp_path)
+        os.utime(path)
+    else:
+        os.replace(tmp_path, path)
+    return StoredFile(sha256, size, sha256, extension)
+
+
+def add_blob_references(db: Session, stored_files: Iterable[StoredFile]) -> None:
+    """Count new work paper references to blobs; the caller commits"""
+    counts = Counter(stored_file.blob_id for stored_file in stored_files)
+    first_seen: Dict[str, StoredFile] = {stored_file.blob_id: stored_file for stored_file in stored_files}
+
+    for blob_id, count in counts.items():
+        if _increment_references(db, blob_id, count):
+            continue
+        stored_file = first_seen[blob_id]
+        try:
+            with db.begin_nested():
+                db.add(UploadBlob(
+                    id=blob_id, size=stored_file.size, extension=stored_file.extension, ref_count=count
+                ))
+        except IntegrityError:
+            # Another request registered the same blob first
+            _increment_references(db, blob_id, count)
+
+
+def _increment_references(db: Session, blob_id: str, count: int) -> bool:
+    updated = db.query(UploadBlob).filter(UploadBlob.id == blob_id).update(
+        {UploadBlob.ref_count: UploadBlob.ref_count + count}, synchronize_session=False
+    )
+    return updated == 1
+
+
+def collect_garbage(db: Session) -> Dict[str, int]:
+    """Recount blob references from work papers and delete unreferenced blobs"""
+    references: Counter = Counter()
+    for (file_paths,) in db.query(WorkPaper.file_paths).yield_per(1000):
+        for entry in file_paths or []:
+            if is_blob_id(entry):
+                references[entry] += 1
+
+    cutoff = time.time() - settings.BLOB_GC_GRACE_SECONDS
+    deleted_blobs = 0
+    freed_bytes = 0
+    known = set()
+    for blob in db.query(UploadBlob).all():
+        known.add(blob.id)
+        blob.ref_count = references.get(blob.id, 0)
+        if blob.ref_count > 0 or not _older_than(blob_path(blob.id), cutoff):
+            continue
+        remove_quietly(blob_path(blob.id))
+        freed_bytes += blob.size
+        deleted_blobs += 1
+        db.delete(blob)
+    db.commit()
+
+    # Files left by uploads whose submission never committed
+    root = os.path.join(settings.UPLOAD_DIR, BLOB_DIR)
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if filename in known or references.get(filename) or not _older_than(path, cutoff):
+                continue
+            freed_bytes += os.path.getsize(path)
+            remove_quietly(path)
+            deleted_blobs += 1
+
+    return {"deleted_blobs": deleted_blobs, "freed_bytes": freed_bytes}
+
+
+def _older_than(path: str, cutoff: float) -> bool:
+    try:
+        return os.path.getmtime(path) < cutoff
+    except OSError:
+        return True
@@ -0,0 +1,57 @@
+"""Normalized audit_findings rows kept in step with each conclusion's findings JSON"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.audit_finding import AuditFinding
+from app.models.conclusion import Conclusion
+
+# (conclusion_id, work_paper_id, findings)
+ConclusionFindings = Tuple[int, int, List[Dict[str, Any]]]
+
+
+def replace_findings(db: Session, conclusions: Iterable[ConclusionFindings]) -> int:
+    """Rewrite the finding rows of the given conclusions; the caller commits"""
+    conclusions = list(conclusions)
+    if not conclusions:
+        return 0
+    db.execute(delete(AuditFinding).where(
+        AuditFinding.conclusion_id.in_([conclusion_id for conclusion_id, _, _ in conclusions])
+    ))
+    rows = [
+        {
+            "conclusion_id": conclusion_id,
+            "work_paper_id": work_paper_id,
+            "attribute_id": finding["attribute_id"],
+            "status": finding["status"]
+        }
+        for conclusion_id, work_paper_id, findings in conclusions
+        for finding in findings or []
+    ]
+    if rows:
+        db.execute(insert(AuditFinding), rows)
+    return len(rows)
+
+
+def backfill(db: Session, rebuild: bool = False, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """Write finding rows for conclusions saved before the table existed, one commit per batch
+
+    With rebuild, every conclusion's rows are rewritten rather than only missing ones.
+    """
+    batch_size = batch_size or settings.AUDIT_BATCH_CHUNK_SIZE
+    stmt = select(Conclusion.id, Conclusion.work_paper_id, Conclusion.findings)
+    if not rebuild:
+        stmt = stmt.where(~exists().where(AuditFinding.conclusion_id == Conclusion.id))
+
+    conclusions = 0
+    findings = 0
+    last_id = 0
+    while True:
+        batch = db.execute(stmt.where(Conclusion.id > last_id).order_by(Conclusion.id).limit(batch_size)).all()
+        if not batch:
+            break
+        findings += replace_findings(db, batch)
+        db.commit()
+        conclusions += len(batch)
+        last_id = batch[-1][0]
+    return {"conclusions": conclusions, "findings": findings}
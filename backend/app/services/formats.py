@@ -0,0 +1,286 @@
+"""Registry of named field formats and guarded custom patterns for FORMAT_VALIDATION rules
+
+A rule names a registered format ({"field": "ein", "format": "tax_id"}) or supplies its
+own regex ({"field": "code", "pattern": "[A-Z]{3}-\\d{4}"}). Patterns are compiled once
+and shared. Custom patterns that can backtrack catastrophically are rejected: nested
+unbounded quantifiers, repeated groups with more than one way to match the same text,
+such as (a|aa)+, and adjacent unbounded quantifiers over overlapping characters, such
+as a*a*. When google-re2 is installed, custom patterns must also compile with it and
+are matched with its linear-time engine. Values longer than FORMAT_MAX_VALUE_LENGTH are
+failed without matching, so a rule cannot stall a worker.
+"""
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Pattern, Tuple
+from app.services.parsers import compile_pattern, parse_date
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+try:
+    import re2
+except ImportError:  # Custom patterns are matched with the standard engine
+    re2 = None
+
+MAX_PATTERN_LENGTH = 500
+
+_UNBOUNDED_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+# Atomic groups and possessive repeats never backtrack into themselves (Python 3.11+)
+_ATOMIC_GROUP = getattr(sre_parse, "ATOMIC_GROUP", None)
+_POSSESSIVE_REPEAT = getattr(sre_parse, "POSSESSIVE_REPEAT", None)
+
+# Characters a pattern can start with: code point intervals, or None for any character
+CharSet = Optional[List[Tuple[int, int]]]
+_NON_ASCII = (128, sys.maxunicode)
+_CATEGORIES = {
+    sre_parse.CATEGORY_DIGIT: [(48, 57), _NON_ASCII],
+    sre_parse.CATEGORY_SPACE: [(9, 13), (32, 32), _NON_ASCII],
+    sre_parse.CATEGORY_WORD: [(48, 57), (65, 90), (95, 95), (97, 122), _NON_ASCII],
+}
+
+
+class FormatSpec(NamedTuple):
+    label: str
+    regex: Pattern
+    check: Optional[Callable[[str], bool]] = None
+
+    def matches(self, text: str) -> bool:
+        if self.regex.fullmatch(text) is None:
+            return False
+        return self.check is None or self.check(text)
+
+
+FORMATS: Dict[str, FormatSpec] = {
+    "account_number": FormatSpec("account_number", re.compile(r"\d{6,17}")),
+    "tax_id": FormatSpec("tax_id", re.compile(r"\d{2}-?\d{7}")),
+    "iso_date": FormatSpec(
+        "iso_date", re.compile(r"\d{4}-\d{2}-\d{2}"), lambda text: parse_date(text) is not None
+    ),
+    "currency_amount": FormatSpec(
+        "currency_amount", re.compile(r"[-+]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d{1,2})?")
+    ),
+}
+
+
+class UnsafePatternError(ValueError):
+    pass
+
+
+def _children(value: Any):
+    if isinstance(value, sre_parse.SubPattern):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _children(item)
+
+
+def _has_nested_repeat(subpattern, inside_unbounded: bool = False) -> bool:
+    for op, av in subpattern:
+        if op in _UNBOUNDED_REPEATS:
+            unbounded = av[1] == sre_parse.MAXREPEAT
+            if unbounded and inside_unbounded:
+                return True
+            if _has_nested_repeat(av[2], inside_unbounded or unbounded):
+                return True
+        else:
+            for child in _children(av):
+                if _has_nested_repeat(child, inside_unbounded):
+                    return True
+    return False
+
+
+def _union(a: CharSet, b: CharSet) -> CharSet:
+    return None if a is None or b is None else a + b
+
+
+def _overlaps(a: CharSet, b: CharSet) -> bool:
+    if a is None:
+        return b is None or bool(b)
+    if b is None:
+        return bool(a)
+    return any(low_a <= high_b and low_b <= high_a for low_a, high_a in a for low_b, high_b in b)
+
+
+def _first_of_set(items) -> CharSet:
+    chars = []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            chars.append((av, av))
+        elif op is sre_parse.RANGE:
+            chars.append(av)
+        elif op is sre_parse.CATEGORY and av in _CATEGORIES:
+            chars.extend(_CATEGORIES[av])
+        else:
+            return None
+    return chars
+
+
+def _first_of_item(op, av) -> Tuple[CharSet, bool]:
+    """Characters the item can start with, and whether it can match the empty string"""
+    if op is sre_parse.LITERAL:
+        return [(av, av)], False
+    if op is sre_parse.IN:
+        return _first_of_set(av), False
+    if op in (sre_parse.NOT_LITERAL, sre_parse.ANY):
+        return None, False
+    if op is sre_parse.SUBPATTERN:
+        return _first(av[-1])
+    if _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+        return _first(av)
+    if op in _UNBOUNDED_REPEATS or (_POSSESSIVE_REPEAT is not None and op is _POSSESSIVE_REPEAT):
+        chars, nullable = _first(av[2])
+        return chars, nullable or av[0] == 0
+    if op is sre_parse.BRANCH:
+        chars, nullable = [], False
+        for alternative in av[1]:
+            alternative_chars, alternative_nullable = _first(alternative)
+            chars = _union(chars, alternative_chars)
+            nullable = nullable or alternative_nullable
+        return chars, nullable
+    if op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+        return [], True
+    # Backreferences, conditionals and anything unrecognised: assume the worst
+    return None, True
+
+
+def _first(items) -> Tuple[CharSet, bool]:
+    chars: CharSet = []
+    for op, av in items:
+        item_chars, nullable = _first_of_item(op, av)
+        chars = _union(chars, item_chars)
+        if not nullable:
+            return chars, False
+    return chars, True
+
+
+def _is_ambiguous(items, follow: CharSet) -> bool:
+    """Whether text can be split between the items of a repeated body in more than one way
+
+    follow is what may come after the items within the repetition, which wraps around
+    to the start of the body.
+    """
+    items = list(items)
+    for position, (op, av) in enumerate(items):
+        rest, rest_nullable = _first(items[position + 1:])
+        after = _union(rest, follow) if rest_nullable else rest
+        if op is sre_parse.BRANCH:
+            firsts = [_first(alternative) for alternative in av[1]]
+            if any(nullable for _, nullable in firsts):
+                return True
+            for index, (chars, _) in enumerate(firsts):
+                if any(_overlaps(chars, other) for other, _ in firsts[index + 1:]):
+                    return True
+            if any(_is_ambiguous(alternative, after) for alternative in av[1]):
+                return True
+        elif op in _UNBOUNDED_REPEATS:
+            minimum, maximum, body = av
+            body_chars, body_nullable = _first(body)
+            if minimum != maximum and (body_nullable or _overlaps(body_chars, after)):
+                return True
+            if _is_ambiguous(body, _union(body_chars, after)):
+                return True
+        elif op is sre_parse.SUBPATTERN:
+            if _is_ambiguous(av[-1], after):
+                return True
+    return False
+
+
+def _has_ambiguous_repeat(subpattern) -> bool:
+    """Unbounded repeats whose body can match the same text in more than one way, e.g. (a|aa)+"""
+    for op, av in subpattern:
+        if op in _UNBOUNDED_REPEATS and av[1] == sre_parse.MAXREPEAT:
+            body_chars, body_nullable = _first(av[2])
+            if body_nullable or _is_ambiguous(av[2], body_chars):
+                return True
+        for child in _children(av):
+            if _has_ambiguous_repeat(child):
+                return True
+    return False
+
+
+def _edge_repeats(items, from_end: bool = False) -> CharSet:
+    """Characters unbounded repeats at the start (or end) of the items can consume"""
+    chars: CharSet = []
+    for op, av in (reversed(items) if from_end else items):
+        if op in _UNBOUNDED_REPEATS:
+            if av[1] == sre_parse.MAXREPEAT:
+                chars = _union(chars, _first(av[2])[0])
+            chars = _union(chars, _edge_repeats(av[2], from_end))
+        elif op is sre_parse.SUBPATTERN:
+            chars = _union(chars, _edge_repeats(av[-1], from_end))
+        elif op is sre_parse.BRANCH:
+            for alternative in av[1]:
+                chars = _union(chars, _edge_repeats(alternative, from_end))
+        if not _first_of_item(op, av)[1]:
+            break
+    return chars
+
+
+def _has_adjacent_repeats(subpattern) -> bool:
+    """Unbounded repeats that can meet and consume the same characters, e.g. a*a*
+
+    Each extra repeat multiplies the ways to split a failing value, so the match time
+    grows polynomially with its length.
+    """
+    items = list(subpattern)
+    for split in range(1, len(items)):
+        if _overlaps(_edge_repeats(items[:split], from_end=True), _edge_repeats(items[split:])):
+            return True
+    return any(_has_adjacent_repeats(child) for _, av in items for child in _children(av))
+
+
+@lru_cache(maxsize=256)
+def _compile_linear(pattern: str):
+    options = re2.Options()
+    options.log_errors = False
+    try:
+        return re2.compile(pattern, options)
+    except re2.error as e:
+        raise UnsafePatternError(
+            f"Format pattern uses syntax the linear-time engine does not support, such as lookarounds "
+            f"or backreferences: {e}"
+        )
+
+
+def check_pattern(pattern: Any) -> Pattern:
+    """Compile a user-supplied format regex, rejecting ones prone to catastrophic backtracking"""
+    if not isinstance(pattern, str):
+        raise UnsafePatternError("Format pattern must be a string")
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise UnsafePatternError(f"Format pattern is longer than {MAX_PATTERN_LENGTH} characters")
+    try:
+        regex = compile_pattern(pattern)
+    except re.error as e:
+        raise UnsafePatternError(f"Format pattern is not a valid regular expression: {e}")
+    parsed = sre_parse.parse(pattern)
+    if _has_nested_repeat(parsed):
+        raise UnsafePatternError("Format pattern nests unbounded quantifiers, e.g. (a+)+")
+    if _has_ambiguous_repeat(parsed):
+        raise UnsafePatternError(
+            "Format pattern repeats a group that can match the same text in more than one way, e.g. (a|aa)+"
+        )
+    if _has_adjacent_repeats(parsed):
+        raise UnsafePatternError(
+            "Format pattern has adjacent unbounded quantifiers over the same characters, e.g. a*a*"
+        )
+    if re2 is not None:
+        return _compile_linear(pattern)
+    return regex
+
+
+def resolve_format(params: Dict[str, Any]) -> FormatSpec:
+    """Format a FORMAT_VALIDATION rule checks against; raises UnsafePatternError if unusable"""
+    name = params.get("format")
+    if name is not None:
+        spec = FORMATS.get(name)
+        if spec is None:
+            raise UnsafePatternError(
+                f"Unknown format '{name}'; expected one of: {', '.join(sorted(FORMATS))}"
+            )
+        return spec
+    if "pattern" not in params:
+        raise UnsafePatternError("Format rule needs a 'format' name or a 'pattern'")
+    return FormatSpec("pattern", check_pattern(params["pattern"]))
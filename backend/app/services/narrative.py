@@ -0,0 +1,132 @@
+"""CPA conclusion narrative rendered from templates
+
+The narrative is produced as a stream of text chunks so large finding sets can be
+joined once or streamed to the client, and it can be rendered on request from the
+stored findings and compliance summary instead of being persisted. The template
+version is recorded with each conclusion so old conclusions keep rendering the same.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+NARRATIVE_VERSION = 1
+
+_HEADER = (
+    "**AUDIT CONCLUSION REPORT**\n\n"
+    "**Overall Compliance Score: {score:.2f}%**\n\n"
+    "**Executive Summary:**\n"
+    "This audit evaluated {total} attributes against the submitted work papers. "
+    "Of the attributes evaluated, {passed} passed, {failed} failed, "
+    "and {warnings} generated warnings.\n\n"
+)
+
+# (minimum score, conclusion paragraph), highest band first
+_CONCLUSIONS = (
+    (90, "**Conclusion:** The work papers demonstrate a high level of compliance with established audit criteria. "
+         "The documentation is substantially complete and accurate, with minimal exceptions noted.\n\n"),
+    (70, "**Conclusion:** The work papers demonstrate moderate compliance with established audit criteria. "
+         "While the majority of requirements are met, certain areas require attention to achieve full compliance.\n\n"),
+    (50, "**Conclusion:** The work papers demonstrate partial compliance with established audit criteria. "
+         "Significant deficiencies were identified that require remediation to ensure proper compliance.\n\n"),
+    (None, "**Conclusion:** The work papers demonstrate limited compliance with established audit criteria. "
+           "Substantial deficiencies were identified that require immediate and comprehensive remediation.\n\n"),
+)
+
+_FINDING = "{emoji} **{name}** ({status})\n   Details: {details}\n"
+_RECOMMENDATION = "   Recommendation: {recommendation}\n"
+
+_FAILED_RECOMMENDATION = "1. Address all failed attributes promptly to improve compliance.\n"
+_WARNING_RECOMMENDATION = "2. Review and resolve warning conditions to enhance documentation quality.\n"
+_CONTROLS_RECOMMENDATION = "3. Implement additional controls and validation procedures to prevent future non-compliance.\n"
+
+_ACCEPTABLE = "\n**Final Assessment:** The work papers are acceptable for audit purposes with minor recommendations for improvement."
+_REVISE = "\n**Final Assessment:** The work papers require revision and resubmission to meet audit standards."
+
+
+def _iter_narrative_v1(score: float, passed: int, failed: int, warnings: int, total: int,
+                       findings: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    yield _HEADER.format(score=score, total=total, passed=passed, failed=failed, warnings=warnings)
+    for minimum, paragraph in _CONCLUSIONS:
+        if minimum is None or score >= minimum:
+            yield paragraph
+            break
+
+    if failed > 0 or warnings > 0:
+        yield "**Detailed Findings:**\n\n"
+        for finding in findings:
+            status = finding["status"]
+            if status == "pass":
+                continue
+            text = _FINDING.format(
+                emoji="❌" if status == "fail" else "⚠️",
+                name=finding["attribute_name"],
+                status=status.upper(),
+                details=finding["details"]
+            )
+            if finding.get("recommendation"):
+                text += _RECOMMENDATION.format(recommendation=finding["recommendation"])
+            yield text + "\n"
+
+    yield "**Recommendations:**\n"
+    if failed > 0:
+        yield _FAILED_RECOMMENDATION
+    if warnings > 0:
+        yield _WARNING_RECOMMENDATION
+    if score < 90:
+        yield _CONTROLS_RECOMMENDATION
+    yield _ACCEPTABLE if score >= 90 else _REVISE
+
+
+# Renderers by narrative_version. When the templates change, add a renderer under the
+# new version and keep the old ones, so saved conclusions render as they did.
+_RENDERERS: Dict[int, Callable[..., Iterator[str]]] = {
+    1: _iter_narrative_v1,
+}
+
+
+def iter_narrative(score: float, passed: int, failed: int, warnings: int, total: int,
+                   findings: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Yield the current narrative in pieces, one per section or finding"""
+    return _RENDERERS[NARRATIVE_VERSION](score, passed, failed, warnings, total, findings)
+
+
+def render_narrative(score: float, passed: int, failed: int, warnings: int, total: int,
+                     findings: Iterable[Dict[str, Any]]) -> str:
+    return "".join(iter_narrative(score, passed, failed, warnings, total, findings))
+
+
+def iter_conclusion_narrative(
+    compliance_summary: Optional[Dict[str, Any]],
+    findings: List[Dict[str, Any]],
+    stored_text: Optional[str] = None
+) -> Iterator[str]:
+    """Narrative of a saved conclusion: the stored text, or rendered from its findings
+
+    Rendering uses the template version the conclusion was saved with; a conclusion
+    without a known version has no narrative to render.
+    """
+    renderer = _RENDERERS.get((compliance_summary or {}).get("narrative_version"))
+    if stored_text or renderer is None:
+        yield stored_text or ""
+        return
+    yield from renderer(
+        compliance_summary["compliance_percentage"],
+        compliance_summary["passed"],
+        compliance_summary["failed"],
+        compliance_summary["warnings"],
+        compliance_summary["total_attributes"],
+        findings
+    )
+
+
+def buffered(chunks: Iterable[str], size: int = 64 * 1024) -> Iterator[bytes]:
+    """Group small chunks into blocks of roughly size bytes for streaming"""
+    parts: List[str] = []
+    length = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(parts).encode("utf-8")
+            parts = []
+            length = 0
+    if parts:
+        yield "".join(parts).encode("utf-8")
@@ -0,0 +1,49 @@
+"""Parsing of form field values shared by the compiled rules and the columnar evaluator
+
+Field values are parsed through bounded memo caches keyed by the raw value, since
+the same dates and codes recur across many work papers in a batch.
+"""
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Optional, Pattern
+from app.core.config import settings
+
+# Non-ISO layouts accepted for date fields, tried in order after ISO 8601
+DATE_FORMATS = ("%Y/%m/%d", "%d.%m.%Y", "%d %b %Y", "%d %B %Y", "%b %d, %Y", "%B %d, %Y")
+
+
+@lru_cache(maxsize=settings.PARSE_CACHE_SIZE)
+def _parse_date_string(value: str) -> Optional[date]:
+    text = value.strip()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).date()
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """Parse a form value into a date, or None if it is not a recognizable date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        return _parse_date_string(value)
+    return None
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> Pattern:
+    """Compile a format regex once per distinct pattern"""
+    return re.compile(pattern)
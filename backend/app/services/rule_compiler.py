@@ -0,0 +1,535 @@
+import copy
+import hashlib
+import json
+import operator
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.models.audit_attribute import AttributeType, RuleType
+from app.core import metrics
+from app.core.config import settings
+from app.services.expressions import EvaluationError, ExpressionError, compile_expression
+from app.services.formats import UnsafePatternError, resolve_format
+from app.services.parsers import parse_date
+
+Finding = Dict[str, Any]
+Evaluator = Callable[[Dict[str, Any], List[str]], Finding]
+
+# Bumped when rule semantics change so fingerprints from older audits stop matching
+COMPILER_VERSION = 3
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+}
+
+
+def _finding(attribute_id: int, attribute_name: str, status: str = "pass",
+             details: Optional[str] = None, recommendation: Optional[str] = None) -> Finding:
+    return {
+        "attribute_id": attribute_id,
+        "attribute_name": attribute_name,
+        "status": status,
+        "details": details,
+        "recommendation": recommendation
+    }
+
+
+def _intern(name: Any) -> Any:
+    return sys.intern(name) if isinstance(name, str) else name
+
+
+# Same output as json.dumps(value, sort_keys=True, default=str) without building an encoder per call
+_encode = json.JSONEncoder(sort_keys=True, default=str).encode
+
+
+def _digest(value: Any) -> str:
+    payload = _encode(value)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+_MISSING_DIGEST = _digest([False])
+
+
+def field_digest(form_data: Dict[str, Any], name: Any) -> str:
+    """Digest of one form field's presence and value"""
+    if not isinstance(form_data, dict):
+        return _digest(form_data)
+    if name in form_data:
+        return _digest([True, form_data[name]])
+    return _MISSING_DIGEST
+
+
+class InputDigests:
+    """Per-paper memo of digests for individual form fields and the file list"""
+
+    __slots__ = ("form_data", "file_paths", "_fields", "_files")
+
+    def __init__(self, form_data: Dict[str, Any], file_paths: List[str]):
+        self.form_data = form_data
+        self.file_paths = file_paths
+        self._fields: Dict[Any, str] = {}
+        self._files: Optional[str] = None
+
+    def field(self, name: Any) -> str:
+        digest = self._fields.get(name)
+        if digest is None:
+            digest = self._fields[name] = field_digest(self.form_data, name)
+        return digest
+
+    def files(self) -> str:
+        if self._files is None:
+            self._files = _digest(self.file_paths)
+        return self._files
+
+
+class CompiledRule:
+    """An attribute pre-bound into a single evaluator callable"""
+
+    __slots__ = ("attribute_id", "attribute_name", "source", "evaluate", "fields", "uses_files",
+                 "_signature", "_prefix")
+
+    def __init__(self, attribute_id: int, attribute_name: str, source: Tuple, evaluate: Evaluator,
+                 fields: Tuple = (), uses_files: bool = False):
+        self.attribute_id = attribute_id
+        self.attribute_name = attribute_name
+        self.source = source
+        self.evaluate = evaluate
+        self.fields = fields
+        self.uses_files = uses_files
+        self._signature = None
+        self._prefix = None
+
+    @property
+    def signature(self) -> str:
+        """Stable hash of the attribute definition this rule was compiled from"""
+        if self._signature is None:
+            payload = json.dumps([COMPILER_VERSION, self.attribute_id, *self.source], sort_keys=True, default=str)
+            self._signature = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return self._signature
+
+    @property
+    def fingerprint_prefix(self) -> str:
+        """Leading part of every fingerprint, identifying the attribute version"""
+        if self._prefix is None:
+            self._prefix = self.signature[:16]
+        return self._prefix
+
+    def fingerprint(self, digests: InputDigests) -> str:
+        """Identifies this attribute version together with the inputs it reads"""
+        parts = [self.fingerprint_prefix]
+        for field in self.fields:
+            parts.append(digests.field(field))
+        if self.uses_files:
+            parts.append(digests.files())
+        return ":".join(parts)
+
+
+class RulePlan:
+    """Ordered set of compiled rules evaluated against each work paper
+
+    Keeps a reverse index from form field to the rules that read it, so rules whose
+    only field is absent are resolved in bulk from a precomputed finding, and edits
+    to a few fields only re-check the rules touching them.
+    """
+
+    def __init__(self, rules: List[CompiledRule]):
+        self.rules = tuple(rules)
+        self.timed = metrics.enabled()
+        index: Dict[Any, List[int]] = {}
+        for position, rule in enumerate(self.rules):
+            for field in rule.fields:
+                index.setdefault(field, []).append(position)
+        self.field_index: Dict[Any, Tuple[int, ...]] = {
+            field: tuple(positions) for field, positions in index.items()
+        }
+
+        # A single-field rule evaluated without that field always yields the same finding
+        self._missing_findings: Dict[int, Finding] = {}
+        self._single_field_positions: Dict[Any, List[int]] = {}
+        for position, rule in enumerate(self.rules):
+            if len(rule.fields) == 1 and not rule.uses_files:
+                self._missing_findings[position] = rule.evaluate({}, [])
+                self._single_field_positions.setdefault(rule.fields[0], []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def positions_for_fields(self, fields) -> set:
+        """Positions of the rules that read any of the given form fields"""
+        positions = set()
+        for field in fields:
+            positions.update(self.field_index.get(field, ()))
+        return positions
+
+    def _missing_positions(self, form_data: Dict[str, Any]) -> set:
+        if not isinstance(form_data, dict):
+            return set()
+        missing = set()
+        for field, positions in self._single_field_positions.items():
+            if field not in form_data:
+                missing.update(positions)
+        return missing
+
+    def _evaluate_rule(self, position: int, missing: set, form_data, file_paths) -> Finding:
+        if position in missing:
+            finding = dict(self._missing_findings[position])
+            if self.timed:
+                metrics.observe_rule(self.rules[position].attribute_id, 0.0, finding["status"])
+            return finding
+        if not self.timed:
+            return self.rules[position].evaluate(form_data, file_paths)
+
+        rule = self.rules[position]
+        start = time.perf_counter()
+        finding = rule.evaluate(form_data, file_paths)
+        metrics.observe_rule(rule.attribute_id, time.perf_counter() - start, finding["status"])
+        return finding
+
+    def evaluate(self, form_data: Dict[str, Any], file_paths: List[str]) -> List[Finding]:
+        missing = self._missing_positions(form_data)
+        return [
+            self._evaluate_rule(position, missing, form_data, file_paths)
+            for position in range(len(self.rules))
+        ]
+
+    def evaluate_incremental(
+        self,
+        form_data: Dict[str, Any],
+        file_paths: List[str],
+        previous_findings: Optional[List[Finding]] = None,
+        changed_fields: Optional[set] = None
+    ) -> Tuple[List[Finding], int]:
+        """Evaluate with fingerprints, reusing previous findings whose fingerprint still matches
+
+        When changed_fields is given the caller knows only those form fields changed, so
+        previous findings of unchanged attributes that read none of them are reused
+        without recomputing input digests. Returns the findings and how many were reused.
+        """
+        previous = {}
+        for finding in previous_findings or []:
+            if finding.get("fingerprint"):
+                previous[finding["attribute_id"]] = finding
+
+        missing = self._missing_positions(form_data)
+        digests = InputDigests(form_data, file_paths)
+        touched = self.positions_for_fields(changed_fields) if changed_fields is not None else None
+        findings = []
+        reused = 0
+        for position, rule in enumerate(self.rules):
+            old = previous.get(rule.attribute_id)
+            if old is not None and touched is not None and position not in touched and not rule.uses_files \
+                    and old["fingerprint"].split(":", 1)[0] == rule.fingerprint_prefix:
+                findings.append(dict(old))
+                reused += 1
+                if self.timed:
+                    metrics.observe_reused(rule.attribute_id)
+                continue
+
+            fingerprint = rule.fingerprint(digests)
+            if old is not None and old["fingerprint"] == fingerprint:
+                finding = dict(old)
+                reused += 1
+                if self.timed:
+                    metrics.observe_reused(rule.attribute_id)
+            else:
+                finding = self._evaluate_rule(position, missing, form_data, file_paths)
+                finding["fingerprint"] = fingerprint
+            findings.append(finding)
+        return findings, reused
+
+
+# Compiled rules keyed by attribute id; an entry is reused only while its source still matches
+_compiled_rules: Dict[int, CompiledRule] = {}
+
+
+def _attribute_source(attribute) -> Tuple:
+    return (
+        attribute.name,
+        attribute.attribute_type,
+        attribute.rule_type,
+        attribute.rule_parameters,
+        attribute.criteria_text,
+        attribute.is_required,
+    )
+
+
+def compile_attribute(attribute) -> CompiledRule:
+    """Compile an attribute, reusing the cached rule if its definition is unchanged"""
+    source = _attribute_source(attribute)
+    cached = _compiled_rules.get(attribute.id)
+    if cached is not None and cached.source == source:
+        return cached
+
+    # Keep a private copy so in-place edits to the ORM JSON value are detected
+    source = copy.deepcopy(source)
+    rule = CompiledRule(
+        attribute.id, attribute.name, source, _build_evaluator(attribute.id, *source),
+        fields=_referenced_fields(*source),
+        uses_files=source[1] == AttributeType.CHECKLIST_CRITERIA
+    )
+    _compiled_rules[attribute.id] = rule
+    return rule
+
+
+def compile_plan(attributes) -> RulePlan:
+    """Compile the active attribute set into a reusable rule plan
+
+    Cached rules of attributes no longer in the set are dropped, so deleted attributes
+    do not stay in memory.
+    """
+    rules = [compile_attribute(attribute) for attribute in attributes]
+    active_ids = {rule.attribute_id for rule in rules}
+    for attribute_id in [attribute_id for attribute_id in _compiled_rules if attribute_id not in active_ids]:
+        del _compiled_rules[attribute_id]
+    return RulePlan(rules)
+
+
+def check_rule(rule_type, rule_parameters: Optional[Dict[str, Any]]) -> None:
+    """Raise UnsafePatternError or ExpressionError for a rule the engine could not use"""
+    if not rule_parameters:
+        return
+    if rule_type == RuleType.FORMAT_VALIDATION:
+        resolve_format(rule_parameters)
+    elif rule_type == RuleType.EXPRESSION:
+        compile_expression(rule_parameters.get("expression"))
+
+
+def invalidate(attribute_id: Optional[int] = None) -> None:
+    """Drop cached compiled rules for one attribute, or all of them"""
+    if attribute_id is None:
+        _compiled_rules.clear()
+    else:
+        _compiled_rules.pop(attribute_id, None)
+
+
+def _build_evaluator(attribute_id: int, name: str, attribute_type, rule_type, rule_parameters,
+                     criteria_text, is_required) -> Evaluator:
+    if attribute_type == AttributeType.VALIDATION_RULE:
+        if not rule_type or not rule_parameters:
+            return _constant(_finding(
+                attribute_id, name, "warning", "Validation rule not properly configured"
+            ))
+        builder = _VALIDATION_BUILDERS.get(rule_type)
+        if builder is None:
+            return _constant(_finding(attribute_id, name))
+        return _guarded(attribute_id, name, builder(attribute_id, name, rule_parameters))
+    if attribute_type == AttributeType.CHECKLIST_CRITERIA:
+        return _compile_checklist(attribute_id, name, criteria_text, is_required)
+    return _constant(_finding(attribute_id, name))
+
+
+def _referenced_fields(name: str, attribute_type, rule_type, rule_parameters,
+                       criteria_text, is_required) -> Tuple:
+    """Form fields an attribute's evaluation depends on"""
+    if attribute_type != AttributeType.VALIDATION_RULE or not rule_type or not rule_parameters:
+        return ()
+    if rule_type not in _VALIDATION_BUILDERS:
+        return ()
+    if rule_type == RuleType.EXPRESSION:
+        try:
+            return tuple(_intern(field) for field in compile_expression(rule_parameters.get("expression")).fields)
+        except ExpressionError:
+            return ()
+    return (_intern(rule_parameters.get("field")),)
+
+
+def _constant(finding: Finding) -> Evaluator:
+    def evaluate(form_data, file_paths):
+        return dict(finding)
+    return evaluate
+
+
+def _guarded(attribute_id: int, name: str, evaluate: Evaluator) -> Evaluator:
+    def guarded(form_data, file_paths):
+        try:
+            return evaluate(form_data, file_paths)
+        except Exception as e:
+            return _finding(attribute_id, name, "warning", f"Error evaluating rule: {str(e)}")
+    return guarded
+
+
+def _compile_threshold(attribute_id: int, name: str, params: Dict[str, Any]) -> Evaluator:
+    field = _intern(params.get("field"))
+    op = params.get("operator")
+    value = params.get("value")
+    compare = OPERATORS.get(op)
+
+    missing_details = f"Required field '{field}' not found in work paper"
+    missing_recommendation = f"Ensure field '{field}' is included in the work paper"
+    numeric_recommendation = f"Ensure field '{field}' contains a valid number"
+    failed_recommendation = f"Review and correct the value for '{field}'"
+
+    def evaluate(form_data, file_paths):
+        if field not in form_data:
+            return _finding(attribute_id, name, "fail", missing_details, missing_recommendation)
+
+        field_value = form_data[field]
+        if not isinstance(field_value, (int, float)):
+            try:
+                field_value = float(field_value)
+            except (ValueError, TypeError):
+                return _finding(
+                    attribute_id, name, "fail",
+                    f"Field '{field}' value '{field_value}' is not numeric",
+                    numeric_recommendation
+                )
+
+        if compare is None or not compare(field_value, value):
+            return _finding(
+                attribute_id, name, "fail",
+                f"Field '{field}' value {field_value} does not meet requirement: {op} {value}",
+                failed_recommendation
+            )
+        return _finding(attribute_id, name)
+
+    return evaluate
+
+
+def _compile_required_field(attribute_id: int, name: str, params: Dict[str, Any]) -> Evaluator:
+    field = _intern(params.get("field"))
+    details = f"Required field '{field}' is missing or empty"
+    recommendation = f"Ensure field '{field}' is provided with a value"
+
+    def evaluate(form_data, file_paths):
+        if field not in form_data or form_data[field] is None or form_data[field] == "":
+            return _finding(attribute_id, name, "fail", details, recommendation)
+        return _finding(attribute_id, name)
+
+    return evaluate
+
+
+def _compile_date_range(attribute_id: int, name: str, params: Dict[str, Any]) -> Evaluator:
+    field = _intern(params.get("field"))
+    start_date = params.get("start_date")
+    end_date = params.get("end_date")
+    start = parse_date(start_date)
+    end = parse_date(end_date)
+    if start is None or end is None:
+        return _constant(_finding(
+            attribute_id, name, "warning",
+            f"Date range bounds ({start_date} to {end_date}) are not valid dates"
+        ))
+
+    missing_details = f"Date field '{field}' not found"
+    missing_recommendation = f"Ensure date field '{field}' is included"
+    invalid_recommendation = f"Enter '{field}' as a date in YYYY-MM-DD format"
+
+    def evaluate(form_data, file_paths):
+        if field not in form_data:
+            return _finding(attribute_id, name, "fail", missing_details, missing_recommendation)
+
+        date_value = form_data[field]
+        parsed = parse_date(date_value)
+        if parsed is None:
+            return _finding(
+                attribute_id, name, "fail",
+                f"Date field '{field}' value '{date_value}' is not a valid date",
+                invalid_recommendation
+            )
+        if parsed < start or parsed > end:
+            return _finding(
+                attribute_id, name, "fail",
+                f"Date '{date_value}' is outside required range ({start_date} to {end_date})",
+                "Ensure date is within the specified range"
+            )
+        return _finding(attribute_id, name)
+
+    return evaluate
+
+
+def _compile_format_validation(attribute_id: int, name: str, params: Dict[str, Any]) -> Evaluator:
+    field = _intern(params.get("field"))
+    try:
+        spec = resolve_format(params)
+    except UnsafePatternError as e:
+        return _constant(_finding(attribute_id, name, "warning", f"Format rule not usable: {e}"))
+
+    max_length = settings.FORMAT_MAX_VALUE_LENGTH
+    missing_details = f"Required field '{field}' not found in work paper"
+    missing_recommendation = f"Ensure field '{field}' is included in the work paper"
+    failed_recommendation = f"Correct the format of '{field}'"
+
+    def evaluate(form_data, file_paths):
+        if field not in form_data or form_data[field] is None:
+            return _finding(attribute_id, name, "fail", missing_details, missing_recommendation)
+
+        field_value = form_data[field]
+        text = field_value if isinstance(field_value, str) else str(field_value)
+        if len(text) > max_length:
+            return _finding(
+                attribute_id, name, "fail",
+                f"Field '{field}' value is longer than {max_length} characters",
+                failed_recommendation
+            )
+        if isinstance(field_value, bool) or not spec.matches(text):
+            return _finding(
+                attribute_id, name, "fail",
+                f"Field '{field}' value '{field_value}' does not match the required format ({spec.label})",
+                failed_recommendation
+            )
+        return _finding(attribute_id, name)
+
+    return evaluate
+
+
+def _compile_expression(attribute_id: int, name: str, params: Dict[str, Any]) -> Evaluator:
+    try:
+        expression = compile_expression(params.get("expression"))
+    except ExpressionError as e:
+        return _constant(_finding(attribute_id, name, "warning", f"Expression not usable: {e}"))
+
+    check = expression.evaluate
+    fields = expression.fields
+    recommendation = params.get("recommendation") or (
+        f"Review the values of {', '.join(repr(field) for field in fields)}" if fields else None
+    )
+
+    def evaluate(form_data, file_paths):
+        try:
+            satisfied = check(form_data)
+        except EvaluationError as e:
+            return _finding(attribute_id, name, "fail", str(e), recommendation)
+        if not satisfied:
+            values = ", ".join(f"{field}={form_data.get(field)!r}" for field in fields)
+            return _finding(
+                attribute_id, name, "fail",
+                f"Expression '{expression.text}' is not satisfied" + (f" ({values})" if values else ""),
+                recommendation
+            )
+        return _finding(attribute_id, name)
+
+    return evaluate
+
+
+def _compile_checklist(attribute_id: int, name: str, criteria_text, is_required) -> Evaluator:
+    missing_details = f"Required checklist item '{criteria_text}' not satisfied - no files uploaded"
+    missing_recommendation = f"Upload supporting documentation for '{criteria_text}'"
+
+    def evaluate(form_data, file_paths):
+        count = len(file_paths)
+        if is_required:
+            if count == 0:
+                return _finding(attribute_id, name, "fail", missing_details, missing_recommendation)
+            return _finding(
+                attribute_id, name, "pass",
+                f"Checklist item '{criteria_text}' satisfied - {count} file(s) uploaded"
+            )
+        return _finding(
+            attribute_id, name, "pass" if count > 0 else "warning",
+            f"Checklist item '{criteria_text}' - {count} file(s) uploaded"
+        )
+
+    return evaluate
+
+
+_VALIDATION_BUILDERS: Dict[RuleType, Callable[[int, str, Dict[str, Any]], Evaluator]] = {
+    RuleType.THRESHOLD: _compile_threshold,
+    RuleType.REQUIRED_FIELD: _compile_required_field,
+    RuleType.DATE_RANGE: _compile_date_range,
+    RuleType.FORMAT_VALIDATION: _compile_format_validation,
+    RuleType.EXPRESSION: _compile_expression,
+}
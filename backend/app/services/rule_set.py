@@ -0,0 +1,82 @@
+"""Process-wide cache of the compiled attribute set, keyed by the rule-set version
+
+Every attribute change bumps a single version row in the same transaction, so API
+processes and audit workers notice it with one primary-key lookup per audit and only
+then reload the attribute rows, as plain immutable records rather than ORM instances.
+"""
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.audit_attribute import AuditAttribute, AttributeType, RuleType
+from app.models.rule_set import RuleSetVersion
+from app.services.rule_compiler import RulePlan, compile_plan
+
+RULE_SET_ID = 1
+
+
+class AttributeRecord(NamedTuple):
+    """The attribute columns the rule compiler reads"""
+    id: int
+    name: str
+    attribute_type: AttributeType
+    rule_type: Optional[RuleType]
+    rule_parameters: Optional[Dict[str, Any]]
+    criteria_text: Optional[str]
+    is_required: Optional[bool]
+
+
+_RECORD_COLUMNS = tuple(getattr(AuditAttribute, field) for field in AttributeRecord._fields)
+
+_lock = threading.Lock()
+_cached: Optional[Tuple[int, RulePlan]] = None
+
+
+def current_version(db: Session) -> int:
+    version = db.scalar(select(RuleSetVersion.version).where(RuleSetVersion.id == RULE_SET_ID))
+    return version or 0
+
+
+def bump_version(db: Session) -> None:
+    """Mark the attribute set as changed; the caller commits along with the attribute change"""
+    if _increment(db):
+        return
+    try:
+        with db.begin_nested():
+            db.add(RuleSetVersion(id=RULE_SET_ID, version=1))
+    except IntegrityError:
+        # Another writer created the row first
+        _increment(db)
+
+
+def _increment(db: Session) -> bool:
+    result = db.execute(
+        update(RuleSetVersion).where(RuleSetVersion.id == RULE_SET_ID).values(
+            version=RuleSetVersion.version + 1, updated_at=datetime.utcnow()
+        )
+    )
+    return result.rowcount == 1
+
+
+def load_attributes(db: Session) -> List[AttributeRecord]:
+    rows = db.execute(select(*_RECORD_COLUMNS).order_by(AuditAttribute.id))
+    return [AttributeRecord(*row) for row in rows]
+
+
+def load_plan(db: Session) -> RulePlan:
+    """Compiled plan for the current attribute set, rebuilt only when the version moved"""
+    global _cached
+    # Read the version before the attributes: a plan is never labelled newer than its rows
+    version = current_version(db)
+    cached = _cached
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _lock:
+        cached = _cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        plan = compile_plan(load_attributes(db))
+        _cached = (version, plan)
+    return plan
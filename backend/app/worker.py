@@ -0,0 +1,33 @@
+"""Run audit workers without the API: python -m app.worker [--workers N]"""
+import argparse
+import logging
+import signal
+import threading
+from app.core.config import settings
+from app.core.database import init_db
+from app.services.audit_jobs import AuditWorkerPool
+import app.models  # noqa: F401
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background audit workers")
+    parser.add_argument("--workers", type=int, default=max(settings.AUDIT_WORKERS, 1))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+
+    pool = AuditWorkerPool(args.workers)
+    pool.start()
+    try:
+        stopped.wait()
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
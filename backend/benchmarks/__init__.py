@@ -0,0 +1 @@
+"""Benchmarks for the audit pipeline: python -m benchmarks.run --help"""
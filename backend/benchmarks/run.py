@@ -0,0 +1,236 @@
+"""Benchmark the audit pipeline against a throwaway SQLite database
+
+    python -m benchmarks.run --papers 2000 --attributes 200 --output results.json
+    python -m benchmarks.run --compare results.json
+
+Synthetic data is generated from --seed, so runs with the same arguments measure
+the same workload. Each benchmark reports throughput, mean, p50 and p99 latency;
+--compare exits non-zero when any p50 regressed by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(int(round(q / 100 * len(sorted_samples) + 0.5)) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+
+def summarize(name: str, samples: List[float], total_bytes: Optional[int] = None) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    total = sum(samples)
+    result = {
+        "name": name,
+        "count": len(samples),
+        "total_seconds": round(total, 6),
+        "throughput_per_second": round(len(samples) / total, 2) if total else None,
+        "mean_ms": round(total / len(samples) * 1000, 4) if samples else None,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+    }
+    if total_bytes is not None and total:
+        result["mb_per_second"] = round(total_bytes / total / (1024 * 1024), 2)
+    return result
+
+
+def measure(name: str, operation: Callable[[Any], Any], items: Iterable[Any], warmup: int = 0,
+            total_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """Time operation once per item; the first warmup items are run but not recorded"""
+    samples = []
+    for position, item in enumerate(items):
+        start = time.perf_counter()
+        operation(item)
+        elapsed = time.perf_counter() - start
+        if position >= warmup:
+            samples.append(elapsed)
+    return summarize(name, samples, total_bytes)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="audit-bench-")
+    try:
+        return _run(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _run(args, workdir: str) -> Dict[str, Any]:
+    # Settings are read at import time, so the app is imported only after pointing it at a scratch DB
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["UPLOAD_DIR"] = os.path.join(workdir, "uploads")
+    os.environ["AUDIT_WORKERS"] = "0"
+    os.environ.setdefault("METRICS_ENABLED", "false")
+
+    from fastapi.testclient import TestClient
+    from app.core.database import SessionLocal
+    from app.main import app
+    from app.models.work_paper import WorkPaper
+    from app.services.audit_engine import AuditEngine
+    from app.services.conclusion_generator import ConclusionGenerator
+    from benchmarks import synthetic
+
+    rnd = random.Random(args.seed)
+    db = SessionLocal()
+    fields = synthetic.field_names(args.fields)
+
+    setup_start = time.perf_counter()
+    users = synthetic.create_users(db, args.auditors)
+    synthetic.create_attributes(db, rnd, args.attributes, fields, users["managers"][0])
+    paper_ids = synthetic.create_work_papers(db, rnd, args.papers, fields, users["auditors"])
+    setup_seconds = time.perf_counter() - setup_start
+
+    sample = paper_ids[:args.sample] if args.sample else paper_ids
+    results = []
+
+    engine = AuditEngine(db)
+    audit_results = {}
+
+    def audit(work_paper_id):
+        audit_results[work_paper_id] = engine.audit_work_paper(work_paper_id)
+
+    results.append(measure("engine.audit_work_paper", audit, sample, warmup=args.warmup))
+
+    generator = ConclusionGenerator(db)
+    results.append(measure(
+        "conclusion.generate_conclusion",
+        lambda work_paper_id: generator.generate_conclusion(work_paper_id, audit_results[work_paper_id]),
+        sample, warmup=args.warmup
+    ))
+
+    batch_start = time.perf_counter()
+    batch = engine.evaluate_work_papers(db.query(WorkPaper).filter(WorkPaper.id.in_(sample)).all())
+    batch_seconds = time.perf_counter() - batch_start
+    results.append({
+        "name": "engine.evaluate_work_papers",
+        "count": len(batch),
+        "total_seconds": round(batch_seconds, 6),
+        "throughput_per_second": round(len(batch) / batch_seconds, 2) if batch_seconds else None,
+    })
+    db.close()
+
+    client = TestClient(app)
+    results.append(measure(
+        "api.trigger_audit",
+        lambda work_paper_id: client.post(
+            f"/api/work-papers/{work_paper_id}/audit", params={"full": True}
+        ).raise_for_status(),
+        sample, warmup=args.warmup
+    ))
+
+    upload_size = args.upload_kb * 1024
+    payloads = [rnd.randbytes(upload_size) for _ in range(args.uploads + args.warmup)]
+
+    def upload(payload):
+        response = client.post(
+            "/api/work-papers/",
+            data={"title": "Upload benchmark", "form_data": json.dumps(synthetic.form_data(rnd, fields))},
+            files=[("files", ("evidence.pdf", payload, "application/pdf"))]
+        )
+        response.raise_for_status()
+
+    results.append(measure(
+        "api.upload_work_paper", upload, payloads, warmup=args.warmup, total_bytes=upload_size * args.uploads
+    ))
+
+    listings = {
+        "api.list_work_papers": "/api/work-papers/",
+        "api.list_work_paper_summaries": "/api/work-papers/summaries",
+        "api.list_conclusions": "/api/conclusions/",
+        "api.list_conclusion_summaries": "/api/conclusions/summaries",
+    }
+    for name, path in listings.items():
+        results.append(measure(
+            name,
+            lambda _, path=path: client.get(path, params={"limit": args.page_size}).raise_for_status(),
+            range(args.list_requests + args.warmup), warmup=args.warmup
+        ))
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "parameters": {
+            key: getattr(args, key)
+            for key in ("seed", "papers", "attributes", "fields", "auditors", "sample", "warmup",
+                        "uploads", "upload_kb", "list_requests", "page_size")
+        },
+        "setup_seconds": round(setup_seconds, 3),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print p50 changes against a baseline report and return the regressed benchmark names"""
+    previous = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    print(f"{'benchmark':36} {'baseline p50':>14} {'current p50':>14} {'change':>9}")
+    for result in current["results"]:
+        before = previous.get(result["name"])
+        if before is None or not before.get("p50_ms") or result.get("p50_ms") is None:
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(result["name"])
+        print(f"{result['name']:36} {before['p50_ms']:>12.3f}ms {result['p50_ms']:>12.3f}ms {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the audit pipeline on a scratch SQLite database")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--papers", type=int, default=1000, help="Work papers to generate")
+    parser.add_argument("--attributes", type=int, default=100, help="Attributes in the generated library")
+    parser.add_argument("--fields", type=int, default=40, help="Form fields per work paper")
+    parser.add_argument("--auditors", type=int, default=10)
+    parser.add_argument("--sample", type=int, default=200, help="Papers timed individually (0 for all)")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed iterations before each benchmark")
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--upload-kb", type=int, default=256)
+    parser.add_argument("--list-requests", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare p50 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed p50 slowdown, e.g. 0.10 for 10%%")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
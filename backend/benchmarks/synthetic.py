@@ -0,0 +1,125 @@
+"""Deterministic synthetic data for benchmarks: users, attribute libraries and work papers"""
+import random
+from datetime import date, timedelta
+from typing import Dict, List
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.security import get_password_hash
+from app.models.audit_attribute import AuditAttribute, AttributeType, RuleType
+from app.models.user import User, UserRole
+from app.models.work_paper import WorkPaper, WorkPaperStatus
+from app.services.rule_set import bump_version
+
+# Relative weight of each kind of attribute in a generated library
+ATTRIBUTE_MIX = {
+    "threshold": 4,
+    "required_field": 3,
+    "date_range": 2,
+    "checklist": 1,
+}
+
+FISCAL_YEAR_START = date(2024, 1, 1)
+
+
+def field_names(count: int) -> List[str]:
+    return [f"field_{i:03d}" for i in range(count)]
+
+
+def create_users(db: Session, auditors: int) -> Dict[str, List[int]]:
+    """One manager plus the given number of auditors, sharing a single password hash"""
+    password_hash = get_password_hash("benchmark")
+    rows = [{"email": "manager@bench.local", "password_hash": password_hash, "role": UserRole.MANAGER}]
+    rows.extend(
+        {"email": f"auditor{i}@bench.local", "password_hash": password_hash, "role": UserRole.AUDITOR}
+        for i in range(auditors)
+    )
+    db.execute(insert(User), rows)
+    db.commit()
+    managers = [user_id for user_id, in db.query(User.id).filter(User.role == UserRole.MANAGER)]
+    auditor_ids = [user_id for user_id, in db.query(User.id).filter(User.role == UserRole.AUDITOR)]
+    return {"managers": managers, "auditors": auditor_ids}
+
+
+def _attribute_row(rnd: random.Random, index: int, kind: str, fields: List[str], created_by: int) -> dict:
+    row = {"name": f"{kind.replace('_', ' ').title()} {index}", "created_by": created_by}
+    if kind == "checklist":
+        row.update(
+            attribute_type=AttributeType.CHECKLIST_CRITERIA,
+            criteria_text=f"Supporting document {index}",
+            is_required=rnd.random() < 0.7
+        )
+        return row
+
+    field = rnd.choice(fields)
+    row["attribute_type"] = AttributeType.VALIDATION_RULE
+    if kind == "threshold":
+        row["rule_type"] = RuleType.THRESHOLD
+        row["rule_parameters"] = {
+            "field": field, "operator": rnd.choice([">", ">=", "<", "<="]), "value": rnd.randint(0, 1000)
+        }
+    elif kind == "required_field":
+        row["rule_type"] = RuleType.REQUIRED_FIELD
+        row["rule_parameters"] = {"field": field}
+    else:
+        start = FISCAL_YEAR_START + timedelta(days=rnd.randint(0, 90))
+        row["rule_type"] = RuleType.DATE_RANGE
+        row["rule_parameters"] = {
+            "field": field,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=rnd.randint(90, 365))).isoformat()
+        }
+    return row
+
+
+def create_attributes(db: Session, rnd: random.Random, count: int, fields: List[str], created_by: int) -> None:
+    kinds = rnd.choices(list(ATTRIBUTE_MIX), weights=list(ATTRIBUTE_MIX.values()), k=count)
+    rows = [_attribute_row(rnd, i, kind, fields, created_by) for i, kind in enumerate(kinds)]
+    # Bulk insert needs every row to carry the same keys
+    keys = {key for row in rows for key in row}
+    db.execute(insert(AuditAttribute), [{key: row.get(key) for key in keys} for row in rows])
+    bump_version(db)
+    db.commit()
+
+
+def form_data(rnd: random.Random, fields: List[str], fill_rate: float = 0.9) -> dict:
+    """Mostly numeric values with some dates, blanks and missing fields"""
+    data = {}
+    for field in fields:
+        roll = rnd.random()
+        if roll > fill_rate:
+            continue
+        if roll < 0.6:
+            data[field] = rnd.randint(-100, 1200)
+        elif roll < 0.8:
+            data[field] = (FISCAL_YEAR_START + timedelta(days=rnd.randint(-60, 420))).isoformat()
+        elif roll < 0.85:
+            data[field] = ""
+        else:
+            data[field] = f"{rnd.uniform(0, 1000):.2f}"
+    return data
+
+
+def create_work_papers(
+    db: Session,
+    rnd: random.Random,
+    count: int,
+    fields: List[str],
+    submitters: List[int],
+    files_per_paper: int = 2,
+    batch_size: int = 1000
+) -> List[int]:
+    for start in range(0, count, batch_size):
+        rows = [
+            {
+                "title": f"Work paper {i}",
+                "description": "Synthetic benchmark work paper",
+                "submitted_by": rnd.choice(submitters),
+                "status": WorkPaperStatus.PENDING,
+                "form_data": form_data(rnd, fields),
+                "file_paths": [f"{rnd.getrandbits(256):064x}" for _ in range(rnd.randint(0, files_per_paper))]
+            }
+            for i in range(start, min(start + batch_size, count))
+        ]
+        db.execute(insert(WorkPaper), rows)
+        db.commit()
+    return [work_paper_id for work_paper_id, in db.query(WorkPaper.id).order_by(WorkPaper.id)]
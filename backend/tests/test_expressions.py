@@ -0,0 +1,15 @@
+import pytest
+from app.services.expressions import ExpressionError, compile_expression
+
+
+@pytest.mark.parametrize("expression", [
+    'x == "a\nb"',
+    r'x == "\N{foo}"',
+])
+def test_invalid_string_literals_raise_expression_error(expression):
+    with pytest.raises(ExpressionError, match="position 5"):
+        compile_expression(expression)
+
+
+def test_valid_string_literal_compiles():
+    compile_expression('x == "a\\nb"')
@@ -0,0 +1,49 @@
+import pytest
+from app.services import formats
+from app.services.formats import UnsafePatternError, check_pattern
+
+
+@pytest.mark.parametrize("pattern", [
+    r"(a+)+b",
+    r"(a|a)*b",
+    r"(a|aa)+b",
+    r"(a?a)*b",
+    r"(?:x|xy)*z",
+    r"a*a*b",
+    r"(a*)(a*)b",
+    r"a*b?a*c",
+])
+def test_rejects_patterns_prone_to_backtracking(pattern):
+    with pytest.raises(UnsafePatternError):
+        check_pattern(pattern)
+
+
+@pytest.mark.parametrize("pattern, value", [
+    (r"[A-Z]{3}-\d{4}", "ABC-1234"),
+    (r"[\w.]+@[\w.]+", "cpa@example.com"),
+    (r"(ab|ac)*", "abacab"),
+    (r"(\d{3},)*\d{3}", "123,456,789"),
+    (r"(\w{1,5}\.)+", "ab.cde."),
+])
+def test_accepts_unambiguous_patterns(pattern, value):
+    assert check_pattern(pattern).fullmatch(value) is not None
+
+
+def test_rejects_invalid_and_oversized_patterns():
+    with pytest.raises(UnsafePatternError):
+        check_pattern("(a")
+    with pytest.raises(UnsafePatternError):
+        check_pattern("a" * 501)
+
+
+def test_rejects_adjacent_repeats_without_re2(monkeypatch):
+    monkeypatch.setattr(formats, "re2", None)
+    with pytest.raises(UnsafePatternError):
+        check_pattern(r"(?=a)a*a*a*a*a*a*a*a*b")
+
+
+@pytest.mark.skipif(formats.re2 is None, reason="google-re2 is not installed")
+@pytest.mark.parametrize("pattern", [r"(?=a)\w+", r"(a)\1"])
+def test_rejects_syntax_re2_cannot_match(pattern):
+    with pytest.raises(UnsafePatternError):
+        check_pattern(pattern)
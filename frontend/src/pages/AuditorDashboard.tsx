@@ -22,7 +22,7 @@ function AuditorDashboard() {
 
   const loadWorkPapers = async () => {
     try {
-      const res = await workPapersAPI.getAll();
+      const res = await workPapersAPI.getSummaries();
       setWorkPapers(res.data);
     } catch (error) {
       console.error('Error loading work papers:', error);
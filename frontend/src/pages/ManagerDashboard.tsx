@@ -35,7 +35,7 @@ function ManagerDashboard() {
     try {
       const [attrsRes, papersRes] = await Promise.all([
         attributesAPI.getAll(),
-        workPapersAPI.getAll(),
+        workPapersAPI.getSummaries(),
       ]);
       setAttributes(attrsRes.data);
       setWorkPapers(papersRes.data);
@@ -52,6 +52,7 @@ export const attributesAPI = {
 // Work Papers API
 export const workPapersAPI = {
   getAll: () => api.get('/work-papers/'),
+  getSummaries: () => api.get('/work-papers/summaries'),
   get: (id: number) => api.get(`/work-papers/${id}`),
   create: (formData: FormData) => api.post('/work-papers/', formData, {
     headers: { 'Content-Type': 'multipart/form-data' },